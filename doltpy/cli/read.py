@@ -1,9 +1,10 @@
+from contextlib import contextmanager
 import logging
 from pathlib import Path
 import random
 import string
 from tempfile import TemporaryDirectory
-from typing import List, Mapping
+from typing import Iterator, List, Mapping, Optional
 import io
 
 
@@ -17,6 +18,9 @@ from doltcli.utils import (  # type: ignore
     read_columns_sql,
 )
 import pandas as pd  # type: ignore
+import pyarrow as pa  # type: ignore
+from pyarrow import csv as pa_csv  # type: ignore
+from pyarrow import parquet as pq  # type: ignore
 
 read_formats = {
     "parquet": ".parquet",
@@ -35,27 +39,167 @@ def read_pandas_sql(dolt: Dolt, sql: str) -> pd.DataFrame:
     return read_table_sql(dolt, sql, result_parser=parse_to_pandas)
 
 
-def read_pandas_parquet(dolt: Dolt, table: str, asof: str = None) -> pd.DataFrame:
+def get_read_table_query(
+    table: str,
+    as_of: str = None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> str:
+    """
+    Builds the query reading a table, selecting only the given columns and the rows matching the where clause, which is
+    SQL and is not escaped, up to limit rows. With no columns, where clause or limit this is the query built by
+    get_read_table_asof_query.
+    :param table:
+    :param as_of:
+    :param columns:
+    :param where:
+    :param limit:
+    :return:
+    """
+    if limit is not None and limit < 0:
+        raise ValueError(f"limit must be a non-negative integer, got {limit}")
+
+    if not columns:
+        query = get_read_table_asof_query(table, as_of)
+    else:
+        projection = ", ".join("`{}`".format(col.replace("`", "``")) for col in columns)
+        query = f"SELECT {projection} FROM `{table}`"
+        query = f'{query} AS OF "{as_of}"' if as_of else query
+    if where:
+        query = f"{query} WHERE {where}"
+    if limit is not None:
+        query = f"{query} LIMIT {int(limit)}"
+    return query
+
+
+@contextmanager
+def _export_parquet(
+    dolt: Dolt,
+    table: str,
+    asof: str = None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Path]:
     # TODO: either dolt export should support as of, or sql query should
     #       support parquet output format
     ab = dolt.active_branch
     letters = string.ascii_lowercase
     tmp_branch = "".join(random.choice(letters) for i in range(10))
+    # dolt table export cannot filter, so when only part of the table is needed it is first selected into a scratch
+    # table on the temporary branch, which is dropped before checking out the original branch again
+    filtered = bool(columns or where or limit is not None)
+    export_table = f"{table}_{tmp_branch}" if filtered else table
     try:
         dolt.checkout(tmp_branch, checkout_branch=True, start_point=asof)
+        if filtered:
+            query = get_read_table_query(table, columns=columns, where=where, limit=limit)
+            dolt.sql(query=f"CREATE TABLE `{export_table}` AS {query}")
         with TemporaryDirectory() as tmpdir:
             fpath = Path(tmpdir) / "tmp.parquet"
-            dolt.table_export(table, filename=str(fpath))
-            return pd.read_parquet(fpath)
+            dolt.table_export(export_table, filename=str(fpath))
+            yield fpath
     finally:
+        if filtered:
+            dolt.sql(query=f"DROP TABLE IF EXISTS `{export_table}`")
         dolt.checkout(ab)
         dolt.branch(tmp_branch, delete=True)
 
 
-def read_pandas(dolt: Dolt, table: str, as_of: str = None, fmt="csv") -> pd.DataFrame:
+def read_pandas_parquet(
+    dolt: Dolt,
+    table: str,
+    asof: str = None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> pd.DataFrame:
+    with _export_parquet(dolt, table, asof, columns, where, limit) as fpath:
+        return pd.read_parquet(fpath)
+
+
+def read_pandas(
+    dolt: Dolt,
+    table: str,
+    as_of: str = None,
+    fmt="csv",
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Reads a table into a DataFrame. The columns, where clause and limit are pushed down to Dolt, see
+    get_read_table_query, so only the data needed is serialized and parsed.
+    :param dolt:
+    :param table:
+    :param as_of:
+    :param fmt:
+    :param columns:
+    :param where:
+    :param limit:
+    :return:
+    """
+    if fmt == "csv":
+        return read_pandas_sql(dolt, get_read_table_query(table, as_of, columns, where, limit))
+    elif fmt == "parquet" or fmt == "pq":
+        return read_pandas_parquet(dolt, table, as_of, columns, where, limit)
+    else:
+        raise RuntimeError(f"unexpected read format: {fmt}; expected: 'parquet' or 'csv'")
+
+
+def parse_to_arrow(sql_output: str) -> pa.Table:
+    # empty fields are NULLs, as they are for parse_to_pandas
+    return pa_csv.read_csv(sql_output, convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+
+
+def read_arrow_sql(dolt: Dolt, sql: str) -> pa.Table:
+    """
+    Reads the result of the query into a pyarrow Table. The CSV output of dolt sql is parsed by Arrow's multithreaded
+    reader directly into columns, without creating a Python object per value.
+    :param dolt:
+    :param sql:
+    :return:
+    """
+    return read_table_sql(dolt, sql, result_parser=parse_to_arrow)
+
+
+def read_arrow_parquet(
+    dolt: Dolt,
+    table: str,
+    asof: str = None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> pa.Table:
+    with _export_parquet(dolt, table, asof, columns, where, limit) as fpath:
+        return pq.read_table(fpath)
+
+
+def read_arrow(
+    dolt: Dolt,
+    table: str,
+    as_of: str = None,
+    fmt="csv",
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> pa.Table:
+    """
+    Reads a table into a pyarrow Table, use doltpy.shared.arrow_to_pandas to convert it to a DataFrame. The columns,
+    where clause and limit are pushed down as for read_pandas.
+    :param dolt:
+    :param table:
+    :param as_of:
+    :param fmt:
+    :param columns:
+    :param where:
+    :param limit:
+    :return:
+    """
     if fmt == "csv":
-        return read_pandas_sql(dolt, get_read_table_asof_query(table, as_of))
+        return read_arrow_sql(dolt, get_read_table_query(table, as_of, columns, where, limit))
     elif fmt == "parquet" or fmt == "pq":
-        return read_pandas_parquet(dolt, table, as_of)
+        return read_arrow_parquet(dolt, table, as_of, columns, where, limit)
     else:
         raise RuntimeError(f"unexpected read format: {fmt}; expected: 'parquet' or 'csv'")
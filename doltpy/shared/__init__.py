@@ -1,2 +1,2 @@
-from .helpers import columns_to_rows, rows_to_columns, to_list
+from .helpers import arrow_to_pandas, batch_iterable, columns_to_rows, rows_to_columns, to_list
 from .system_helpers import register_cleanup
@@ -1,5 +1,9 @@
+import itertools
 from collections import defaultdict
-from typing import Iterable, List, Mapping, Union, Any
+from typing import Any, Iterable, Iterator, List, Mapping, Union
+
+import pandas as pd  # type: ignore
+import pyarrow as pa  # type: ignore
 
 
 def columns_to_rows(columns: Mapping[str, list]) -> List[dict]:
@@ -14,12 +18,40 @@ def columns_to_rows(columns: Mapping[str, list]) -> List[dict]:
 
 def rows_to_columns(rows: Iterable[dict]) -> Mapping[str, list]:
     columns: Mapping[str, list] = defaultdict(list)
-    for i, row in enumerate(list(rows)):
+    for row in rows:
         for col, val in row.items():
             columns[col].append(val)
 
     return columns
 
 
+def batch_iterable(iterable: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """
+    Consumes an iterable lazily, yielding lists of at most batch_size elements.
+    :param iterable:
+    :param batch_size:
+    :return:
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Converts a pyarrow Table to a DataFrame, giving each column its own block so that numeric columns without nulls
+    are not copied, and releasing the Arrow buffers as each column is converted so the data is not held twice. The
+    table must not be used after it has been converted.
+    :param table:
+    :return:
+    """
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
 def to_list(value: Union[Any, List[Any]]) -> Any:
     return [value] if not isinstance(value, list) and value is not None else value
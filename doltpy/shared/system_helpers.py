@@ -1,23 +1,40 @@
 import atexit
 import logging
-from typing import List
-
-import psutil  # type: ignore
+from typing import Callable, Dict, List
 
 HANDLERS: List[str] = []
 SQL_LOG_FILE = None
+# the processes doltpy stops at exit, by pid, with the function that stops each of them
+PROCESSES: Dict[int, Callable[[], None]] = {}
 
 
 def cleanup():
     logger = logging.getLogger(__name__)
-    logger.info("Before exiting cleaning up child processes")
-    all_processes = psutil.Process().children(recursive=True)
-    if all_processes:
-        for p in all_processes:
-            p.kill()
-        logger.info("Cleaned up, exiting")
+    logger.info("Before exiting stopping child processes")
+    if PROCESSES:
+        for pid, stop in list(PROCESSES.items()):
+            try:
+                stop()
+            except Exception as e:
+                logger.warning(f"Failed to stop process {pid}: {e}")
+        logger.info("Stopped child processes, exiting")
     else:
-        logger.info("No processes to clean up, exiting")
+        logger.info("No processes to stop, exiting")
+
+
+def register_process(pid: int, stop: Callable[[], None]):
+    """
+    Registers a process to be stopped by calling stop at exit, if it has not been unregistered by then. Processes that
+    are not registered, such as shared sql-server daemons, are left running.
+    :param pid:
+    :param stop:
+    :return:
+    """
+    PROCESSES[pid] = stop
+
+
+def unregister_process(pid: int):
+    PROCESSES.pop(pid, None)
 
 
 def register_cleanup():
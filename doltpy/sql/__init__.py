@@ -2,11 +2,22 @@ from doltpy.shared import register_cleanup
 from .sql import (
     DEFAULT_HOST,
     DEFAULT_PORT,
+    BatchWriteError,
     DoltSQLContext,
     DoltSQLServerContext,
     DoltSQLEngineContext,
     ServerConfig,
     Commit,
+    WRITE_MODE_INSERT,
+    WRITE_MODE_EXECUTEMANY,
+    WRITE_MODE_LOAD_DATA,
+    DRIVER_MYSQLCONNECTOR,
+    DRIVER_PYMYSQL,
 )
+from .async_sql import AsyncDoltSQLContext
+from .changeset import TableChangeset
+from .server import ServerStartupError
+from .server_pool import DoltSQLServerPool, ROUTING_ROUND_ROBIN, ROUTING_LEAST_LOADED
+from .supervisor import ServerMetrics
 
 register_cleanup()
@@ -0,0 +1,353 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import pandas as pd  # type: ignore
+
+from ..cli import Commit
+from ..shared import batch_iterable, to_list
+from ..sql.helpers import (
+    ColumnBuffer,
+    clean_columns,
+    finish_column_buffer,
+    get_column_buffer,
+    get_executemany_upsert_statement,
+    iter_column_batches,
+)
+from ..sql.sql import DEFAULT_BATCH_SIZE, DEFAULT_READ_BATCH_SIZE, ServerConfig
+
+try:
+    import aiomysql  # type: ignore
+except ImportError:
+    aiomysql = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 10
+
+
+class AsyncDoltSQLContext:
+    """
+    An asyncio equivalent of DoltSQLContext for a running Dolt SQL Server, built on aiomysql and its connection pool, so
+    that many queries can be in flight from a single event loop. Install it with the async extra, doltpy[async], which
+    needs Python 3.7 or later.
+
+        async with AsyncDoltSQLContext("my_db", ServerConfig(user="root")) as context:
+            rows, df = await asyncio.gather(context.read_rows("prices"), context.read_pandas("symbols", as_of=commit))
+
+    Writes are sent as parameterized upserts with executemany, as with the "executemany" write mode of DoltSQLContext,
+    and the table must exist.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        server_config: ServerConfig,
+        pool_min_size: int = DEFAULT_POOL_MIN_SIZE,
+        pool_max_size: int = DEFAULT_POOL_MAX_SIZE,
+    ):
+        if aiomysql is None:
+            raise ImportError("AsyncDoltSQLContext requires aiomysql, install doltpy[async]")
+        self.database = database
+        self.server_config = server_config
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool: Optional[Any] = None
+        self.primary_keys: Dict[str, Tuple[str, ...]] = {}
+
+    async def __aenter__(self) -> "AsyncDoltSQLContext":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def connect(self):
+        if self.pool is not None:
+            return
+        logger.info(
+            f"Creating connection pool for Dolt SQL Server instance running on "
+            f"{self.server_config.host}:{self.server_config.port}"
+        )
+        self.pool = await aiomysql.create_pool(
+            host=self.server_config.host,
+            port=self.server_config.port,
+            user=self.server_config.user,
+            password=self.server_config.password or "",
+            db=self.database,
+            minsize=self.pool_min_size,
+            maxsize=self.pool_max_size,
+            autocommit=True,
+        )
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    def _get_pool(self) -> Any:
+        if self.pool is None:
+            raise ValueError("The context is not connected, use it with async with or call connect first")
+        return self.pool
+
+    async def _execute(
+        self, sql: str, params: Optional[Any] = None, cursor_class: Optional[Any] = None
+    ) -> Tuple[List[str], List[Any]]:
+        """
+        Executes the statement on a pooled connection, returning the column names and rows of its result, if any.
+        :param sql:
+        :param params:
+        :param cursor_class:
+        :return:
+        """
+        async with self._get_pool().acquire() as conn:
+            async with conn.cursor(cursor_class or aiomysql.Cursor) as cursor:
+                await cursor.execute(sql, params)
+                if cursor.description is None:
+                    return [], []
+                columns = [description[0] for description in cursor.description]
+                return columns, list(await cursor.fetchall())
+
+    async def execute(
+        self, sql: str, commit: bool = False, commit_message: Optional[str] = None, allow_empty: bool = False
+    ) -> Optional[str]:
+        await self._execute(sql)
+        self.primary_keys.clear()
+
+        if commit:
+            if not commit_message:
+                raise ValueError("Passed commit as True, but no commit message")
+            return await self.commit_tables(commit_message, None, allow_empty)
+
+        return None
+
+    async def commit_tables(
+        self,
+        commit_message: Optional[str] = None,
+        table_or_tables: Optional[Union[str, List[str]]] = None,
+        allow_empty: bool = False,
+    ) -> str:
+        """
+        Adds the tables, or all tables if none are given, and commits them, returning the hash of the commit. Both
+        procedures are called on the same connection, since staged changes belong to the session.
+        :param commit_message:
+        :param table_or_tables:
+        :param allow_empty:
+        :return:
+        """
+        tables = to_list(table_or_tables)
+        dolt_commit_args = ["-m", commit_message] if tables else ["-a", "-m", commit_message]
+        if allow_empty:
+            dolt_commit_args.append("--allow-empty")
+
+        async with self._get_pool().acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                if tables:
+                    await cursor.execute(f"CALL DOLT_ADD({', '.join('%s' for _ in tables)})", tables)
+                await cursor.execute(f"CALL DOLT_COMMIT({', '.join('%s' for _ in dolt_commit_args)})", dolt_commit_args)
+                result = await cursor.fetchall()
+
+        assert len(result) == 1, "Expected a single returned row with a commit hash"
+        return result[0]["hash"]
+
+    async def write_rows(
+        self,
+        table_name: str,
+        rows: Iterable[dict],
+        on_duplicate_key_update: bool = True,
+        commit: bool = False,
+        commit_message: Optional[str] = None,
+        allow_empty: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Optional[str]:
+        """
+        Write rows to an existing table in batches of batch_size, each batch sent with executemany. As with
+        DoltSQLContext.write_rows, every row must have the same keys as the first, and a row with other keys raises a
+        ValueError rather than having the missing columns written as NULL.
+        """
+        primary_key = await self._get_primary_key(table_name)
+        rows = iter(rows)
+        first_row = next(rows, None)
+        if first_row is not None:
+            columns = list(first_row.keys())
+            for batch in batch_iterable(itertools.chain([first_row], rows), batch_size):
+                for row in batch:
+                    if row.keys() != first_row.keys():
+                        raise ValueError(
+                            f"Every row must have the columns {columns}, got a row with {list(row.keys())}"
+                        )
+                values = [[row[col] for row in batch] for col in columns]
+                await self._write_columns_batch(table_name, primary_key, columns, values, on_duplicate_key_update)
+
+        if commit:
+            return await self.commit_tables(commit_message, table_name, allow_empty)
+        return None
+
+    async def write_pandas(
+        self,
+        table: str,
+        df: pd.DataFrame,
+        on_duplicate_key_update: bool = True,
+        commit: bool = False,
+        commit_message: Optional[str] = None,
+        allow_empty: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Optional[str]:
+        """
+        Write a DataFrame to an existing table, building parameter tuples directly from its columns.
+        """
+        primary_key = await self._get_primary_key(table)
+        for columns, values in iter_column_batches({col: df[col] for col in df.columns}, batch_size):
+            await self._write_columns_batch(table, primary_key, columns, values, on_duplicate_key_update)
+
+        if commit:
+            return await self.commit_tables(commit_message, table, allow_empty)
+        return None
+
+    async def _write_columns_batch(
+        self,
+        table: str,
+        primary_key: Tuple[str, ...],
+        columns: List[str],
+        values: List[list],
+        on_duplicate_key_update: bool,
+    ):
+        statement = get_executemany_upsert_statement(table, tuple(columns), primary_key, on_duplicate_key_update)
+        params = list(zip(*clean_columns(values)))
+        async with self._get_pool().acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.executemany(statement, params)
+
+    async def _get_primary_key(self, table: str) -> Tuple[str, ...]:
+        if table not in self.primary_keys:
+            columns, rows = await self._execute(
+                """
+                SELECT
+                    column_name
+                FROM
+                    information_schema.columns
+                WHERE
+                    table_schema = DATABASE() AND table_name = %s AND column_key = 'PRI'
+                ORDER BY
+                    ordinal_position
+            """,
+                (table,),
+            )
+            self.primary_keys[table] = tuple(row[0] for row in rows)
+        return self.primary_keys[table]
+
+    async def read_columns(
+        self, table: str, as_of: Optional[str] = None, typed: bool = False
+    ) -> Mapping[str, ColumnBuffer]:
+        return await self.read_columns_sql(self._get_read_table_asof_query(table, as_of), typed=typed)
+
+    async def read_rows(self, table: str, as_of: Optional[str] = None) -> List[dict]:
+        return await self.read_rows_sql(self._get_read_table_asof_query(table, as_of))
+
+    async def read_pandas(self, table: str, as_of: Optional[str] = None) -> pd.DataFrame:
+        return await self.read_pandas_sql(self._get_read_table_asof_query(table, as_of))
+
+    @classmethod
+    def _get_read_table_asof_query(cls, table: str, as_of: Optional[str] = None) -> str:
+        base_query = f"SELECT * FROM `{table}`"
+        return f'{base_query} AS OF "{as_of}"' if as_of else base_query
+
+    async def read_columns_sql(
+        self, sql: str, batch_size: int = DEFAULT_READ_BATCH_SIZE, typed: bool = False
+    ) -> Mapping[str, ColumnBuffer]:
+        """
+        Reads the result of the query into a list per column, or a masked array per numeric column when typed is set,
+        as DoltSQLContext.read_columns_sql does.
+        :param sql:
+        :param batch_size:
+        :param typed:
+        :return:
+        """
+        columns: List[str] = []
+        buffers: List[Any] = []
+        async with self._get_pool().acquire() as conn:
+            async with conn.cursor(aiomysql.SSCursor) as cursor:
+                await cursor.execute(sql)
+                columns = [description[0] for description in cursor.description]
+                buffers = [get_column_buffer(description, typed) for description in cursor.description]
+                while True:
+                    batch = await cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    for buffer, values in zip(buffers, zip(*batch)):
+                        buffer.extend(values)
+
+        return {col: finish_column_buffer(buffer) for col, buffer in zip(columns, buffers)}
+
+    async def read_rows_sql(self, sql: str) -> List[dict]:
+        _, rows = await self._execute(sql, cursor_class=aiomysql.DictCursor)
+        return rows
+
+    async def read_pandas_sql(self, sql: str) -> pd.DataFrame:
+        columns, rows = await self._execute(sql)
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    async def iter_batches(
+        self, table: str, as_of: Optional[str] = None, batch_size: int = DEFAULT_READ_BATCH_SIZE
+    ) -> AsyncIterator[List[dict]]:
+        async for batch in self.iter_batches_sql(self._get_read_table_asof_query(table, as_of), batch_size):
+            yield batch
+
+    async def iter_batches_sql(self, sql: str, batch_size: int = DEFAULT_READ_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+        """
+        Streams the result of the query from the server on an unbuffered cursor, yielding lists of at most batch_size
+        rows. Closing the cursor drains any rows not consumed, so the connection can be returned to the pool.
+        :param sql:
+        :param batch_size:
+        :return:
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+
+        async with self._get_pool().acquire() as conn:
+            async with conn.cursor(aiomysql.SSDictCursor) as cursor:
+                await cursor.execute(sql)
+                while True:
+                    batch = await cursor.fetchmany(batch_size)
+                    if not batch:
+                        return
+                    yield list(batch)
+
+    async def log(self) -> Dict:
+        rows = await self.read_rows_sql(Commit.get_log_table_query())
+        return Commit.parse_dolt_log_table(rows)
+
+    async def diff(
+        self, from_commit: str, to_commit: str, table_or_tables: Union[str, List[str]]
+    ) -> Mapping[str, pd.DataFrame]:
+        """
+        Reads the diff of each table between the two commits, with the tables read concurrently.
+        :param from_commit:
+        :param to_commit:
+        :param table_or_tables:
+        :return:
+        """
+        tables = [table_or_tables] if isinstance(table_or_tables, str) else table_or_tables
+
+        def get_query(table: str) -> str:
+            return f"""
+                SELECT
+                    *
+                FROM
+                    dolt_diff_{table}
+                WHERE
+                    from_commit = '{from_commit}'
+                    AND to_COMMIT = '{to_commit}'
+            """
+
+        results = await asyncio.gather(*(self.read_pandas_sql(get_query(table)) for table in tables))
+        return dict(zip(tables, results))
+
+    async def tables(self) -> List[str]:
+        _, rows = await self._execute(
+            "select table_name from information_schema.tables where table_schema = DATABASE();"
+        )
+        return [row[0] for row in rows]
@@ -0,0 +1,159 @@
+import datetime
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, TypeVar
+
+import sqlalchemy as sa  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_TARGET_SECONDS = 2.0
+MIN_BATCH_BYTES = 64 * 1024
+
+# Rows are sized individually until this many have been seen, after which only every ROW_SAMPLE_INTERVAL-th row is
+# sized and the rest are assumed to be the running average
+ROW_SAMPLE_WARMUP, ROW_SAMPLE_INTERVAL = 1000, 16
+
+# ER_NET_PACKET_TOO_LARGE from the server, and CR_NET_PACKET_TOO_LARGE from the client
+PACKET_TOO_LARGE_ERRNOS = (1153, 2020)
+
+Row = TypeVar("Row")
+
+
+def estimate_value_bytes(val: Any) -> int:
+    """
+    Rough size of a value once encoded in a statement, including quoting and separators.
+    :param val:
+    :return:
+    """
+    if val is None:
+        return 5
+    elif isinstance(val, (str, bytes)):
+        return len(val) + 3
+    elif isinstance(val, (bool, int, float)):
+        return 21
+    elif isinstance(val, (datetime.date, datetime.datetime)):
+        return 29
+    else:
+        return len(str(val)) + 3
+
+
+def estimate_row_bytes(row: Any) -> int:
+    """
+    Estimates the encoded size of a row, either a dict or a sequence of values.
+    :param row:
+    :return:
+    """
+    values = row.values() if isinstance(row, dict) else row
+    return sum(estimate_value_bytes(val) for val in values) + 3
+
+
+def is_packet_too_large_error(e: BaseException) -> bool:
+    orig = getattr(e, "orig", e)
+    if getattr(orig, "errno", None) in PACKET_TOO_LARGE_ERRNOS:
+        return True
+    message = str(orig).lower()
+    return "max_allowed_packet" in message or "packet too large" in message
+
+
+class AdaptiveBatchSizer:
+    """
+    Sizes batches by their estimated encoded size in bytes rather than by a fixed number of rows, so that wide tables
+    stay under max_allowed_packet and narrow tables are not under-batched. The budget starts at target_bytes, shrinks
+    when statements take longer than target_seconds, recovers towards target_bytes when they are quick, and is halved,
+    along with the ceiling it recovers to, when the server rejects a statement for being too large.
+    """
+
+    def __init__(self, target_bytes: int, target_seconds: float = DEFAULT_BATCH_TARGET_SECONDS):
+        if target_bytes < 1:
+            raise ValueError(f"target_bytes must be a positive integer, got {target_bytes}")
+        self.target_bytes = target_bytes
+        self.target_seconds = target_seconds
+        self.budget_bytes = target_bytes
+        self.rows_sized = 0
+        self.average_row_bytes = 0.0
+        self.lock = threading.Lock()
+
+    def batches(self, rows: Iterable[Row]) -> Iterator[List[Row]]:
+        """
+        Lazily splits rows into batches whose estimated size is within the current budget.
+        :param rows:
+        :return:
+        """
+        batch: List[Row] = []
+        batch_bytes = 0
+        for row in rows:
+            row_bytes = self.row_bytes(row)
+            if batch and batch_bytes + row_bytes > self.budget_bytes:
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(row)
+            batch_bytes += row_bytes
+
+        if batch:
+            yield batch
+
+    def row_bytes(self, row: Any) -> int:
+        if self.rows_sized < ROW_SAMPLE_WARMUP or self.rows_sized % ROW_SAMPLE_INTERVAL == 0:
+            row_bytes = estimate_row_bytes(row)
+            sampled = min(self.rows_sized, ROW_SAMPLE_WARMUP)
+            self.average_row_bytes = (self.average_row_bytes * sampled + row_bytes) / (sampled + 1)
+        else:
+            row_bytes = int(self.average_row_bytes)
+        self.rows_sized += 1
+        return row_bytes
+
+    def record(self, seconds: float):
+        """
+        Adjusts the budget from the latency of a statement.
+        :param seconds:
+        :return:
+        """
+        with self.lock:
+            if seconds > self.target_seconds:
+                scale = max(0.5, self.target_seconds / seconds)
+                self.budget_bytes = max(MIN_BATCH_BYTES, int(self.budget_bytes * scale))
+            elif seconds < self.target_seconds / 2:
+                self.budget_bytes = min(self.target_bytes, int(self.budget_bytes * 1.25))
+
+    def record_too_large(self):
+        with self.lock:
+            self.budget_bytes = max(MIN_BATCH_BYTES, self.budget_bytes // 2)
+            self.target_bytes = min(self.target_bytes, self.budget_bytes)
+            logger.warning(f"Statement too large for the server, reduced batch budget to {self.budget_bytes} bytes")
+
+
+def write_batch_adaptive(
+    sizer: AdaptiveBatchSizer, batch: List[Row], write_batch: Callable[[List[Row]], None], retry: bool = True
+):
+    """
+    Writes a batch with write_batch and reports its latency to sizer. If the server rejects the statement as too large
+    the budget is reduced, and the batch is split in half and each half written in turn.
+
+    The server can close the connection after rejecting a packet, so with retry set to False, for writes that must stay
+    on one connection, a batch rejected as too large raises a ValueError instead of being split.
+    :param sizer:
+    :param batch:
+    :param write_batch:
+    :param retry:
+    :return:
+    """
+    start = time.perf_counter()
+    try:
+        write_batch(batch)
+    except sa.exc.DBAPIError as e:
+        if len(batch) <= 1 or not is_packet_too_large_error(e):
+            raise
+        sizer.record_too_large()
+        if not retry:
+            raise ValueError(
+                f"The server rejected a batch of {len(batch)} rows as too large, and it cannot be split and retried on "
+                f"the same connection. Lower ServerConfig.batch_target_bytes or raise the server's max_allowed_packet"
+            ) from e
+        mid = len(batch) // 2
+        write_batch_adaptive(sizer, batch[:mid], write_batch)
+        write_batch_adaptive(sizer, batch[mid:], write_batch)
+        return
+
+    sizer.record(time.perf_counter() - start)
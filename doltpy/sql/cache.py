@@ -0,0 +1,148 @@
+import logging
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Set
+
+import pandas as pd  # type: ignore
+import pyarrow as pa  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# quoted strings and identifiers are kept as they are, runs of whitespace elsewhere are collapsed
+_SQL_TOKENS = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\s+""")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normalizes the whitespace of a query, outside of quoted strings and identifiers, so that queries differing only in
+    formatting share cache entries.
+    :param sql:
+    :return:
+    """
+    normalized = _SQL_TOKENS.sub(lambda match: match.group(1) or " ", sql).strip()
+    return normalized.rstrip(";").rstrip()
+
+
+def estimate_result_bytes(result: Any) -> int:
+    """
+    Estimates the memory held by a query result, a DataFrame, a pyarrow Table, or a list of dicts.
+    :param result:
+    :return:
+    """
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    elif isinstance(result, pa.Table):
+        return result.nbytes
+    elif isinstance(result, list):
+        return sys.getsizeof(result) + sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(val) for val in row.values()) for row in result
+        )
+    else:
+        raise ValueError(f"Results of type {type(result)} cannot be cached")
+
+
+def copy_result(result: Any) -> Any:
+    """
+    Copies a cached result before it is returned, so that callers modifying it do not modify the cache. pyarrow Tables
+    are immutable, so only a new Table sharing the same buffers is created, which keeps the cached Table usable if the
+    copy is converted with self_destruct.
+    :param result:
+    :return:
+    """
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+    elif isinstance(result, pa.Table):
+        return pa.Table.from_batches(result.to_batches(), schema=result.schema)
+    else:
+        return [dict(row) for row in result]
+
+
+@dataclass
+class ResultCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+
+class ResultCache:
+    """
+    An LRU cache of query results bounded by their estimated size in bytes. Callers are responsible for only caching
+    results that cannot change, that is reads pinned to commit hashes. Results larger than the bound are not cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be a positive integer, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.entry_bytes: Dict[Hashable, int] = {}
+        self.size_bytes = 0
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        # commit hashes confirmed to exist, a hash always refers to the same commit so these never need refreshing
+        self.commit_hashes: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns a copy of the cached result, or None if there is none.
+        :param key:
+        :return:
+        """
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            result = self.entries[key]
+        return copy_result(result)
+
+    def put(self, key: Hashable, result: Any):
+        """
+        Caches a copy of the result, evicting the least recently used results until it fits.
+        :param key:
+        :param result:
+        :return:
+        """
+        result_bytes = estimate_result_bytes(result)
+        if result_bytes > self.max_bytes:
+            logger.info(f"Result of {result_bytes} bytes is larger than the cache, not caching")
+            return
+
+        result = copy_result(result)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            while self.entries and self.size_bytes + result_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+            self.entries[key] = result
+            self.entry_bytes[key] = result_bytes
+            self.size_bytes += result_bytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.entry_bytes.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> ResultCacheStats:
+        with self.lock:
+            return ResultCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self.entries),
+                size_bytes=self.size_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def _remove(self, key: Hashable):
+        del self.entries[key]
+        self.size_bytes -= self.entry_bytes.pop(key)
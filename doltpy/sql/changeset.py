@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pandas as pd  # type: ignore
+
+from ..sql.helpers import to_sql_literal
+
+DIFF_TYPE_ADDED = "added"
+DIFF_TYPE_MODIFIED = "modified"
+DIFF_TYPE_REMOVED = "removed"
+DIFF_TYPES = (DIFF_TYPE_ADDED, DIFF_TYPE_MODIFIED, DIFF_TYPE_REMOVED)
+
+
+@dataclass
+class TableChangeset:
+    """
+    The rows of a table that changed between two commits. Inserts hold the new values of each inserted row and deletes
+    the last values of each deleted row, under the table's column names. Updates hold the primary key under its own
+    column names, and the values of every other column before and after the update as from_<column> and to_<column>.
+    """
+
+    table: str
+    inserts: pd.DataFrame
+    updates: pd.DataFrame
+    deletes: pd.DataFrame
+
+
+def get_changeset_query(
+    table: str,
+    from_commit: str,
+    to_commit: str,
+    diff_type: str,
+    columns: List[str],
+    primary_key: List[str],
+    where: Optional[str] = None,
+) -> str:
+    """
+    Builds a query on the DOLT_DIFF table function selecting the rows with the given diff_type, projected to the primary
+    key and the given columns. The commits can be anything that resolves to a commit, such as a hash, a branch, a tag or
+    HEAD~1, as well as WORKING and STAGED. The where clause is SQL over the columns of the diff, for example
+    to_price > 10, and is not escaped.
+    :param table:
+    :param from_commit:
+    :param to_commit:
+    :param diff_type:
+    :param columns:
+    :param primary_key:
+    :param where:
+    :return:
+    """
+    if diff_type not in DIFF_TYPES:
+        raise ValueError(f"diff_type must be one of {DIFF_TYPES}, got {diff_type}")
+
+    def quote(name: str) -> str:
+        return "`{}`".format(name.replace("`", "``"))
+
+    cols = primary_key + [col for col in columns if col not in primary_key]
+    if diff_type == DIFF_TYPE_ADDED:
+        projection = [f"{quote(f'to_{col}')} AS {quote(col)}" for col in cols]
+    elif diff_type == DIFF_TYPE_REMOVED:
+        projection = [f"{quote(f'from_{col}')} AS {quote(col)}" for col in cols]
+    else:
+        projection = [f"{quote(f'to_{col}')} AS {quote(col)}" for col in primary_key]
+        for col in cols[len(primary_key) :]:
+            projection.extend([quote(f"from_{col}"), quote(f"to_{col}")])
+
+    conditions = [f"diff_type = '{diff_type}'"]
+    if where:
+        conditions.append(f"({where})")
+
+    return f"""
+        SELECT
+            {', '.join(projection)}
+        FROM
+            DOLT_DIFF({to_sql_literal(from_commit)}, {to_sql_literal(to_commit)}, {to_sql_literal(table)})
+        WHERE
+            {' AND '.join(conditions)}
+    """
@@ -0,0 +1,249 @@
+import bisect
+import datetime
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from typing import Container, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.engine import Connection  # type: ignore
+
+from ..cli import Commit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PAGE_SIZE = 1000
+
+
+def get_log_page_query(page_size: int, offset: int) -> str:
+    """
+    A page of the log of HEAD joined to the parents of each commit. Rows are ordered so that the rows for the parents of
+    a merge commit are adjacent, though they can still be split across two pages.
+    :param page_size:
+    :param offset:
+    :return:
+    """
+    return f"""
+        SELECT
+            dc.`commit_hash` AS commit_hash,
+            dca.`parent_hash` AS parent_hash,
+            `committer` AS committer,
+            `email` AS email,
+            `date` AS date,
+            `message` AS message
+        FROM
+            dolt_log AS dc
+            LEFT OUTER JOIN dolt_commit_ancestors AS dca
+                ON dc.commit_hash = dca.commit_hash
+        ORDER BY
+            `date` DESC, dc.`commit_hash`, dca.`parent_index`
+        LIMIT {int(page_size)} OFFSET {int(offset)}
+    """
+
+
+class CommitGraph:
+    """
+    An in-memory index of the commit graph of a database, refreshed incrementally. A refresh first compares HEAD to the
+    head already indexed, and when it has moved reads the log a page at a time, newest first, only until every parent
+    referenced by a newly seen commit is indexed. Since the index is closed under ancestry, that is exactly the set of
+    new commits.
+
+    Parents and commits are looked up by hash in O(1) and commits as of a timestamp by bisection in O(log n). Ancestry
+    is not indexed, is_ancestor and merge_base search the graph, but each commit's generation, its distance from the
+    root along the longest path, limits the search to the commits with a generation at or above that of the ancestor
+    or merge base, rather than the whole history. The log of HEAD is sorted once, and when HEAD moves to a descendant
+    only the new commits are sorted and merged into it.
+
+    Every query takes the lock, so it sees the index either before or after a concurrent refresh.
+    """
+
+    def __init__(self, page_size: int = DEFAULT_LOG_PAGE_SIZE):
+        self.page_size = page_size
+        self.head: Optional[str] = None
+        self.commits: Dict[str, Commit] = {}
+        self.parents: Dict[str, Tuple[str, ...]] = {}
+        self.generations: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        # the log of the indexed head, newest first, and its timestamps in ascending order for bisection
+        self._log: Optional["OrderedDict[str, Commit]"] = None
+        self._log_head: Optional[str] = None
+        self._log_timestamps: List[datetime.datetime] = []
+        self._log_refs: List[str] = []
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self.commits
+
+    def __len__(self) -> int:
+        return len(self.commits)
+
+    def refresh(self, conn: Connection) -> bool:
+        """
+        Brings the index up to date with HEAD of the connection's session, returning True if HEAD had moved.
+        :param conn:
+        :return:
+        """
+        with self.lock:
+            head = conn.execute("SELECT HASHOF('HEAD') AS head").scalar()
+            if head == self.head:
+                return False
+
+            if head not in self.commits:
+                self._add_new_commits(conn, head)
+            logger.info(f"Commit graph head moved from {self.head} to {head}, {len(self.commits)} commits indexed")
+            self.head = head
+            return True
+
+    def _add_new_commits(self, conn: Connection, head: str):
+        new_commits: Dict[str, Commit] = {}
+        new_parents: Dict[str, List[str]] = {}
+        offset = 0
+        while True:
+            rows = [dict(row) for row in conn.execute(get_log_page_query(self.page_size, offset))]
+            offset += len(rows)
+            for row in rows:
+                ref = row["commit_hash"]
+                if ref in self.commits:
+                    continue
+                if ref not in new_commits:
+                    new_commits.update(Commit.parse_dolt_log_table([row]))
+                    new_parents[ref] = []
+                elif row["parent_hash"] is not None:
+                    new_commits[ref].append_parent(row["parent_hash"])
+                if row["parent_hash"] is not None:
+                    new_parents[ref].append(row["parent_hash"])
+
+            referenced = {head}.union(*new_parents.values())
+            missing = {ref for ref in referenced if ref not in self.commits and ref not in new_commits}
+            # a page can end between the rows for the parents of a merge commit, so reading stops only once a page
+            # ends on a commit that was already indexed
+            if len(rows) < self.page_size or (not missing and rows and rows[-1]["commit_hash"] in self.commits):
+                break
+
+        for ref, commit in new_commits.items():
+            self.commits[ref] = commit
+            self.parents[ref] = tuple(new_parents[ref])
+        # parents can be newer than their children when commit dates are set explicitly, so generations are assigned
+        # after all the new commits are indexed
+        for ref in new_commits:
+            self._get_generation(ref)
+
+    def _get_generation(self, ref: str) -> int:
+        stack = [ref]
+        while stack:
+            current = stack[-1]
+            if current in self.generations:
+                stack.pop()
+                continue
+            unknown = [parent for parent in self.parents[current] if parent not in self.generations]
+            if unknown:
+                stack.extend(unknown)
+            else:
+                self.generations[current] = 1 + max((self.generations[p] for p in self.parents[current]), default=-1)
+                stack.pop()
+        return self.generations[ref]
+
+    def log(self) -> "OrderedDict[str, Commit]":
+        """
+        Returns the commits reachable from the indexed head, newest first, in the format of DoltSQLContext.log.
+        :return:
+        """
+        with self.lock:
+            return OrderedDict(self._get_log())
+
+    def _get_log(self) -> "OrderedDict[str, Commit]":
+        head = self.head
+        if self._log is not None and self._log_head == head:
+            return self._log
+
+        if head is None:
+            commits: List[Commit] = []
+        elif self._log is not None and self._log_head is not None and self._is_ancestor(self._log_head, head):
+            # the old log is closed under ancestry, so the search stops at it and only finds the new commits
+            new_refs = self._get_ancestors(head, stop=self._log)
+            new_commits = sorted((self.commits[ref] for ref in new_refs), key=lambda c: c.timestamp, reverse=True)
+            commits = list(heapq.merge(new_commits, self._log.values(), key=lambda c: c.timestamp, reverse=True))
+        else:
+            ancestors = self._get_ancestors(head)
+            commits = sorted((self.commits[ref] for ref in ancestors), key=lambda c: c.timestamp, reverse=True)
+
+        self._log = OrderedDict((commit.ref, commit) for commit in commits)
+        self._log_head = head
+        self._log_timestamps = [commit.timestamp for commit in reversed(commits)]
+        self._log_refs = [commit.ref for commit in reversed(commits)]
+        return self._log
+
+    def get_parents(self, ref: str) -> Tuple[str, ...]:
+        with self.lock:
+            return self.parents[ref]
+
+    def commit_as_of(self, timestamp: datetime.datetime) -> Optional[str]:
+        """
+        Returns the most recent commit in the log of the indexed head made at or before the timestamp, or None if there
+        is none.
+        :param timestamp:
+        :return:
+        """
+        with self.lock:
+            self._get_log()
+            index = bisect.bisect_right(self._log_timestamps, timestamp)
+            return self._log_refs[index - 1] if index else None
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """
+        Returns True if ancestor is reachable from descendant, including when they are the same commit. The search only
+        visits ancestors of descendant with a generation at or above that of ancestor.
+        :param ancestor:
+        :param descendant:
+        :return:
+        """
+        with self.lock:
+            return self._is_ancestor(ancestor, descendant)
+
+    def _is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        min_generation = self.generations[ancestor]
+        return ancestor in self._get_ancestors(descendant, min_generation)
+
+    def merge_base(self, left: str, right: str) -> Optional[str]:
+        """
+        Returns the best common ancestor of the two commits, the one with the highest generation, or None if they have
+        no common history. Ancestors of both commits are visited together in decreasing order of generation, marked
+        with the sides they are reachable from, and the first commit reachable from both is the merge base, so only
+        commits with a generation at or above that of the merge base are visited, in O(k log k) for k such commits.
+        :param left:
+        :param right:
+        :return:
+        """
+        left_side, right_side = 1, 2
+        with self.lock:
+            sides = {left: left_side}
+            sides[right] = sides.get(right, 0) | right_side
+            heap = [(-self.generations[ref], ref) for ref in sides]
+            heapq.heapify(heap)
+            while heap:
+                _, ref = heapq.heappop(heap)
+                # every child of a commit has a higher generation, so its sides are final once it is popped
+                if sides[ref] == left_side | right_side:
+                    return ref
+                for parent in self.parents[ref]:
+                    if parent not in sides:
+                        sides[parent] = 0
+                        heapq.heappush(heap, (-self.generations[parent], parent))
+                    sides[parent] |= sides[ref]
+            return None
+
+    def _get_ancestors(self, ref: str, min_generation: int = 0, stop: Container[str] = ()) -> Set[str]:
+        """
+        Returns ref and its ancestors with a generation at or above min_generation, without visiting commits in stop.
+        :param ref:
+        :param min_generation:
+        :param stop:
+        :return:
+        """
+        ancestors = {ref}
+        stack = [ref]
+        while stack:
+            for parent in self.parents[stack.pop()]:
+                if parent not in ancestors and parent not in stop and self.generations[parent] >= min_generation:
+                    ancestors.add(parent)
+                    stack.append(parent)
+        return ancestors
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterator, List, Optional
+
+import psutil  # type: ignore
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "doltpy_sql_server.json"
+LOCK_FILE = "doltpy_sql_server.lock"
+DEFAULT_DAEMON_IDLE_TIMEOUT = 60.0
+WATCH_INTERVAL = 1.0
+STOP_TIMEOUT = 10.0
+
+
+@dataclass
+class DaemonState:
+    pid: int
+    create_time: float
+    host: str
+    port: int
+    # one entry per attached context, so a process attached twice appears twice
+    clients: List[int] = field(default_factory=list)
+    idle_since: Optional[float] = None
+
+
+def is_process_running(pid: int, create_time: Optional[float] = None) -> bool:
+    """
+    Returns True if the process is running and is not a zombie. When create_time is given the process must also have
+    been created at that time, so that a reused pid is not mistaken for the original process.
+    :param pid:
+    :param create_time:
+    :return:
+    """
+    try:
+        proc = psutil.Process(pid)
+        if create_time is not None and proc.create_time() != create_time:
+            return False
+        return proc.status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        return False
+
+
+class ServerDaemon:
+    """
+    Shares one Dolt SQL Server between the contexts of any number of processes. The server's pid, address and attached
+    clients are kept in a state file in the repository directory, which is only read or written while holding an
+    exclusive lock on a lockfile next to it. The first context to attach starts the server, along with a watchdog
+    process that stops it once no live process has been attached for idle_timeout seconds. Clients that exit without
+    detaching are pruned by the watchdog, so a crashed script does not keep the server running.
+    """
+
+    def __init__(self, repo_dir: str, idle_timeout: float = DEFAULT_DAEMON_IDLE_TIMEOUT):
+        if fcntl is None:
+            raise ValueError("Dolt SQL Server daemons require fcntl file locks, which this platform does not support")
+        self.repo_dir = repo_dir
+        self.idle_timeout = idle_timeout
+        self.state_path = os.path.join(repo_dir, STATE_FILE)
+        self.lock_path = os.path.join(repo_dir, LOCK_FILE)
+        self.pid: Optional[int] = None
+
+    def attach(self, host: str, port: int, start_server: Callable[[], int]) -> bool:
+        """
+        Attaches the current process to the repository's server, calling start_server, which returns the pid of the
+        process it started, if none is running. Returns True if the server was started by this call.
+        :param host:
+        :param port:
+        :param start_server:
+        :return:
+        """
+        with self._lock():
+            state = self._read_state()
+            started = state is None
+            if state is None:
+                pid = start_server()
+                state = DaemonState(pid, psutil.Process(pid).create_time(), host, port)
+                self._start_watchdog()
+            elif (state.host, state.port) != (host, port):
+                raise ValueError(
+                    f"A Dolt SQL Server for {self.repo_dir} is already running on {state.host}:{state.port}, "
+                    f"not on {host}:{port}"
+                )
+
+            state.clients.append(os.getpid())
+            state.idle_since = None
+            self._write_state(state)
+            self.pid = state.pid
+
+        logger.info(f"{'Started' if started else 'Attached to'} Dolt SQL Server daemon with pid {state.pid}")
+        return started
+
+    def detach(self):
+        """
+        Detaches one context of the current process. The server keeps running, and is stopped by the watchdog if no
+        other client attaches within idle_timeout seconds.
+        :return:
+        """
+        with self._lock():
+            state = self._read_state()
+            if state is None:
+                return
+            if os.getpid() in state.clients:
+                state.clients.remove(os.getpid())
+            if not state.clients:
+                state.idle_since = time.time()
+            self._write_state(state)
+
+    def watch(self, interval: float = WATCH_INTERVAL):
+        """
+        Checks the server every interval seconds until it has exited or has been stopped for being idle.
+        :param interval:
+        :return:
+        """
+        while self.check():
+            time.sleep(interval)
+
+    def check(self) -> bool:
+        """
+        Prunes clients that are no longer running and stops the server if it has had no clients for idle_timeout
+        seconds. Returns False once the server is no longer running.
+        :return:
+        """
+        with self._lock():
+            state = self._read_state()
+            if state is None:
+                return False
+
+            state.clients = [pid for pid in state.clients if is_process_running(pid)]
+            if state.clients:
+                state.idle_since = None
+            elif state.idle_since is None:
+                state.idle_since = time.time()
+            elif time.time() - state.idle_since >= self.idle_timeout:
+                logger.info(f"Stopping Dolt SQL Server daemon with pid {state.pid} after {self.idle_timeout}s idle")
+                self._stop_server(state)
+                os.remove(self.state_path)
+                return False
+
+            self._write_state(state)
+            return True
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_state(self) -> Optional[DaemonState]:
+        """
+        Reads the state file, removing it and returning None if the server it describes is no longer running.
+        :return:
+        """
+        if not os.path.exists(self.state_path):
+            return None
+
+        with open(self.state_path) as state_file:
+            state = DaemonState(**json.load(state_file))
+        if not is_process_running(state.pid, state.create_time):
+            logger.warning(f"Dolt SQL Server daemon with pid {state.pid} is no longer running")
+            os.remove(self.state_path)
+            return None
+        return state
+
+    def _write_state(self, state: DaemonState):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as state_file:
+            json.dump(asdict(state), state_file)
+        os.replace(tmp_path, self.state_path)
+
+    def _start_watchdog(self):
+        subprocess.Popen(
+            [sys.executable, "-m", "doltpy.sql.daemon", self.repo_dir, str(self.idle_timeout)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    @classmethod
+    def _stop_server(cls, state: DaemonState):
+        # the server is usually not a child of the watchdog, and stays a zombie until its own parent exits, so it is
+        # polled rather than waited on
+        try:
+            proc = psutil.Process(state.pid)
+            proc.terminate()
+            deadline = time.time() + STOP_TIMEOUT
+            while is_process_running(state.pid, state.create_time) and time.time() < deadline:
+                time.sleep(0.05)
+            if is_process_running(state.pid, state.create_time):
+                proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+def main(argv: List[str]):
+    repo_dir, idle_timeout = argv
+    ServerDaemon(repo_dir, float(idle_timeout)).watch()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
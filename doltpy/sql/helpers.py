@@ -1,9 +1,17 @@
+import array
+import csv
+import itertools
 import logging
 import datetime
-from typing import Any, Iterable, List, Mapping, Tuple, Optional, Dict
+import decimal
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Sequence, Tuple, Optional, Dict, TextIO, Union
 
+import numpy as np  # type: ignore
 import pandas as pd  # type: ignore
-from sqlalchemy import Column, Date, DateTime, Float, Integer, MetaData, String, Table  # type: ignore
+import pyarrow as pa  # type: ignore
+from mysql.connector import FieldType  # type: ignore
+from sqlalchemy import Column, Date, DateTime, Float, Integer, MetaData, String, Table, Text  # type: ignore
 from sqlalchemy.engine import Engine  # type: ignore
 from sqlalchemy.sql import select  # type: ignore
 
@@ -11,6 +19,9 @@ from doltpy.shared import rows_to_columns
 
 logger = logging.getLogger(__name__)
 
+# the shortest VARCHAR created for a string primary key column by infer_table_schema
+MIN_KEY_STRING_LENGTH = 255
+
 
 def clean_types(data: Iterable[dict]) -> List[dict]:
     """
@@ -18,34 +29,492 @@ def clean_types(data: Iterable[dict]) -> List[dict]:
     datetime.date (though that seems like a bug in the connector). This implements a very crude transformation of array
     types and coerces datetime.date values to equivalents. This is quite an experimental feature and is currently a way
     to transform array valued data read from Postgres to Dolt.
+
+    When every row has the same columns the cleaning is done column-wise by clean_columns.
     :param data:
     :return:
     """
-    data_copy: List[Dict[str, Any]] = []
-    for row in data:
-        row_copy: Dict[str, Any] = {}
-        for col, val in row.items():
-            if isinstance(val, pd.Timestamp):
-                row_copy[col] = val.to_pydatetime()
-            elif isinstance(val, datetime.datetime):
-                row_copy[col] = val
-            elif isinstance(val, datetime.date):
-                row_copy[col] = datetime.datetime.combine(val, datetime.time())
-            elif isinstance(val, list):
-                if not val:
-                    row_copy[col] = None
-                else:
-                    row_copy[col] = ",".join(str(el) if el is not None else "NULL" for el in val)
-            elif isinstance(val, dict):
-                row_copy[col] = str(val)
-            elif pd.isna(val):
-                row_copy[col] = None
-            else:
-                row_copy[col] = val
-
-        data_copy.append(row_copy)
-
-    return data_copy
+    rows = data if isinstance(data, list) else list(data)
+    if not rows:
+        return []
+
+    col_names = list(rows[0].keys())
+    if any(row.keys() != rows[0].keys() for row in rows):
+        return [{col: _clean_value(val) for col, val in row.items()} for row in rows]
+
+    columns = clean_columns([[row[col] for row in rows] for col in col_names])
+    return [dict(zip(col_names, vals)) for vals in zip(*columns)]
+
+
+def clean_columns(columns: Iterable[list]) -> List[list]:
+    """
+    Column-wise equivalent of clean_types, for a list of column buffers as produced by iter_column_batches. The
+    conversion for each column is chosen once from the types of its values, and applied with NumPy/pandas where
+    possible. Columns holding values of more than one type fall back to cleaning value by value.
+    :param columns:
+    :return:
+    """
+    return [_get_column_cleaner(column)(column) for column in columns]
+
+
+_NULL_TYPES = {type(None), type(pd.NaT), type(pd.NA)}
+_SCALAR_TYPES = (str, bytes, bool, int, float, np.bool_, np.integer, np.floating)
+
+
+def _get_column_cleaner(column: list) -> Callable[[list], list]:
+    col_types = set(map(type, column)) - _NULL_TYPES
+    if not col_types:
+        return _clean_nulls
+    elif len(col_types) > 1:
+        return _clean_values
+
+    col_type = col_types.pop()
+    if issubclass(col_type, pd.Timestamp):
+        return _clean_timestamps
+    elif issubclass(col_type, datetime.datetime):
+        return _clean_nulls
+    elif issubclass(col_type, datetime.date):
+        return _clean_dates
+    elif issubclass(col_type, list):
+        return _clean_lists
+    elif issubclass(col_type, dict):
+        return _clean_dicts
+    elif issubclass(col_type, _SCALAR_TYPES):
+        return _clean_nulls
+    else:
+        return _clean_values
+
+
+def _clean_values(column: list) -> list:
+    return [_clean_value(val) for val in column]
+
+
+def _clean_nulls(column: list) -> list:
+    values = np.empty(len(column), dtype=object)
+    values[:] = column
+    mask = pd.isna(values)
+    if not mask.any():
+        return column
+    values[mask] = None
+    return values.tolist()
+
+
+def _clean_timestamps(column: list) -> list:
+    try:
+        index = pd.DatetimeIndex(column)
+    except (TypeError, ValueError):
+        # for example a mix of timezones, which a single index cannot hold
+        return _clean_values(column)
+    values = index.to_pydatetime().astype(object)
+    values[index.isna()] = None
+    return values.tolist()
+
+
+def _clean_dates(column: list) -> list:
+    # converting object arrays of dates via datetime64 is slower than combining them one at a time
+    combine, midnight = datetime.datetime.combine, datetime.time()
+    return [combine(val, midnight) if val is not None else None for val in _clean_nulls(column)]
+
+
+def _clean_lists(column: list) -> list:
+    return [
+        ",".join(str(el) if el is not None else "NULL" for el in val) if val else None for val in _clean_nulls(column)
+    ]
+
+
+def _clean_dicts(column: list) -> list:
+    return [str(val) if val is not None else None for val in _clean_nulls(column)]
+
+
+def _clean_value(val: Any) -> Any:
+    if isinstance(val, pd.Timestamp):
+        return val.to_pydatetime()
+    elif isinstance(val, datetime.datetime):
+        return val
+    elif isinstance(val, datetime.date):
+        return datetime.datetime.combine(val, datetime.time())
+    elif isinstance(val, list):
+        if not val:
+            return None
+        else:
+            return ",".join(str(el) if el is not None else "NULL" for el in val)
+    elif isinstance(val, dict):
+        return str(val)
+    elif pd.isna(val):
+        return None
+    else:
+        return val
+
+
+def iter_column_batches(
+    columns: Union[Mapping[str, Iterable[Any]], pa.Table], batch_size: int
+) -> Iterator[Tuple[List[str], List[list]]]:
+    """
+    Yields tuples of column names and a list of column buffers holding at most batch_size values each. pyarrow Tables,
+    lists, tuples, NumPy arrays and pandas Series are sliced directly, other iterables are consumed lazily. Values are
+    converted to Python objects one batch at a time, with datetime64 values becoming datetime.datetime and NaT None.
+    :param columns:
+    :param batch_size:
+    :return:
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+
+    if isinstance(columns, pa.Table):
+        names = columns.column_names
+        for offset in range(0, columns.num_rows, batch_size):
+            batch = columns.slice(offset, batch_size)
+            yield names, [batch.column(name).to_pylist() for name in names]
+        return
+
+    names = list(columns.keys())
+    buffers = [columns[name] for name in names]
+    buffers = [_series_to_numpy(buffer) if isinstance(buffer, pd.Series) else buffer for buffer in buffers]
+    sliceable = [buffer for buffer in buffers if isinstance(buffer, (list, tuple, np.ndarray))]
+    if len(sliceable) == len(buffers):
+        lengths = {len(buffer) for buffer in sliceable}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns must all have the same length, got lengths {sorted(lengths)}")
+        row_count = lengths.pop() if lengths else 0
+        for offset in range(0, row_count, batch_size):
+            yield names, [_column_to_list(buffer[offset : offset + batch_size]) for buffer in sliceable]
+    else:
+        iterators = [iter(buffer) for buffer in buffers]
+        while True:
+            batch = [list(itertools.islice(iterator, batch_size)) for iterator in iterators]
+            if not batch or not batch[0]:
+                return
+            yield names, [_column_to_list(column) for column in batch]
+
+
+def _series_to_numpy(series: pd.Series) -> np.ndarray:
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    # extension types, for example nullable integers or timezone aware datetimes, are kept as objects so that integers
+    # are not cast to floats and timezones are preserved, pd.NA and NaT are then cleaned to None by clean_columns
+    return series.to_numpy(dtype=object)
+
+
+def _column_to_list(column: Union[Sequence[Any], np.ndarray]) -> list:
+    if isinstance(column, np.ndarray):
+        if np.issubdtype(column.dtype, np.datetime64):
+            # tolist on microsecond precision yields datetime.datetime, and None for NaT
+            return column.astype("datetime64[us]").tolist()
+        return column.tolist()
+    return list(column)
+
+
+# Arrow types for the MySQL column types whose Python values have an unambiguous Arrow equivalent, other columns have
+# their type inferred from their values
+_ARROW_TYPES = {
+    FieldType.TINY: pa.int64(),
+    FieldType.SHORT: pa.int64(),
+    FieldType.INT24: pa.int64(),
+    FieldType.LONG: pa.int64(),
+    FieldType.LONGLONG: pa.int64(),
+    FieldType.YEAR: pa.int64(),
+    FieldType.FLOAT: pa.float64(),
+    FieldType.DOUBLE: pa.float64(),
+    FieldType.DATE: pa.date32(),
+    FieldType.NEWDATE: pa.date32(),
+    FieldType.DATETIME: pa.timestamp("us"),
+    FieldType.TIMESTAMP: pa.timestamp("us"),
+}
+_UNSIGNED_FLAG = 32
+
+
+def get_arrow_type(description: Sequence[Any]) -> Optional[pa.DataType]:
+    """
+    Returns the Arrow type for a column from its entry in cursor.description, or None if it should be inferred.
+    :param description:
+    :return:
+    """
+    type_code = description[1]
+    if type_code == FieldType.LONGLONG and len(description) > 7 and (description[7] or 0) & _UNSIGNED_FLAG:
+        return pa.uint64()
+    return _ARROW_TYPES.get(type_code)
+
+
+# a column read by read_columns_sql, see get_column_buffer
+ColumnBuffer = Union[list, np.ma.MaskedArray]
+
+# array.array type codes for the MySQL column types returned as Python ints and floats
+_ARRAY_TYPECODES = {
+    FieldType.TINY: "q",
+    FieldType.SHORT: "q",
+    FieldType.INT24: "q",
+    FieldType.LONG: "q",
+    FieldType.LONGLONG: "q",
+    FieldType.YEAR: "q",
+    FieldType.FLOAT: "d",
+    FieldType.DOUBLE: "d",
+}
+
+
+class MaskedColumnBuffer:
+    """
+    Collects the values of an integer or floating point column in an array.array of a machine type, with NULLs stored
+    as zero and flagged in a mask, so that the column becomes a NumPy masked array without copying.
+    """
+
+    def __init__(self, typecode: str):
+        self.values = array.array(typecode)
+        self.mask = array.array("B")
+
+    def extend(self, values: Sequence[Any]):
+        self.values.extend(0 if val is None else val for val in values)
+        self.mask.extend(val is None for val in values)
+
+    def to_masked_array(self) -> np.ma.MaskedArray:
+        return np.ma.MaskedArray(
+            np.frombuffer(self.values, dtype=self.values.typecode), mask=np.frombuffer(self.mask, dtype=bool)
+        )
+
+
+def get_column_buffer(description: Sequence[Any], typed: bool = False) -> Union[list, MaskedColumnBuffer]:
+    """
+    Returns an empty buffer for a column from its entry in cursor.description. Columns are collected in lists, unless
+    typed is set, in which case integer and floating point columns are collected in a MaskedColumnBuffer. Whether a
+    column is typed depends only on its type, never on the values it holds.
+    :param description:
+    :param typed:
+    :return:
+    """
+    type_code = description[1]
+    if not typed or type_code not in _ARRAY_TYPECODES:
+        return []
+    if type_code == FieldType.LONGLONG and len(description) > 7 and (description[7] or 0) & _UNSIGNED_FLAG:
+        return MaskedColumnBuffer("Q")
+    return MaskedColumnBuffer(_ARRAY_TYPECODES[type_code])
+
+
+def finish_column_buffer(buffer: Union[list, MaskedColumnBuffer]) -> ColumnBuffer:
+    """
+    Returns the column collected in a buffer from get_column_buffer, a list or a NumPy masked array of int64, uint64 or
+    float64 values with NULLs masked.
+    :param buffer:
+    :return:
+    """
+    return buffer.to_masked_array() if isinstance(buffer, MaskedColumnBuffer) else buffer
+
+
+def iter_cursor_batches(cursor: Any, batch_size: int) -> Iterator[List[tuple]]:
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield batch
+
+
+def rows_to_record_batch(
+    columns: List[str], arrow_types: List[Optional[pa.DataType]], rows: List[tuple]
+) -> pa.RecordBatch:
+    """
+    Converts a batch of row tuples to an Arrow RecordBatch, transposing the rows and converting each column directly to
+    an Arrow array.
+    :param columns:
+    :param arrow_types:
+    :param rows:
+    :return:
+    """
+    arrays = [_to_arrow_array(values, arrow_type) for values, arrow_type in zip(zip(*rows), arrow_types)]
+    return pa.RecordBatch.from_arrays(arrays, names=columns)
+
+
+def _to_arrow_array(values: Sequence[Any], arrow_type: Optional[pa.DataType]) -> pa.Array:
+    if arrow_type is not None:
+        try:
+            return pa.array(values, type=arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            logger.debug(f"Values do not match Arrow type {arrow_type}, inferring type")
+    return pa.array(values)
+
+
+def record_batches_to_table(
+    columns: List[str], arrow_types: List[Optional[pa.DataType]], record_batches: List[pa.RecordBatch]
+) -> pa.Table:
+    """
+    Combines RecordBatches from rows_to_record_batch into a Table. Columns whose type was inferred can have a different
+    type in each batch, for example null when every value in a batch is NULL, so batches are cast to a common schema
+    when their schemas differ.
+    :param columns:
+    :param arrow_types:
+    :param record_batches:
+    :return:
+    """
+    if not record_batches:
+        schema = pa.schema([(col, arrow_type or pa.null()) for col, arrow_type in zip(columns, arrow_types)])
+        return schema.empty_table()
+
+    schemas = [record_batch.schema for record_batch in record_batches]
+    if all(schema.equals(schemas[0]) for schema in schemas):
+        return pa.Table.from_batches(record_batches)
+
+    try:
+        # permissive promotion, for example widening decimals, is only available in newer versions of pyarrow
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+    except TypeError:
+        schema = pa.unify_schemas(schemas)
+    return pa.concat_tables(pa.Table.from_batches([batch]).cast(schema) for batch in record_batches)
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates DataFrames read from ranges of the same query. pandas infers the dtype of each range separately, so a
+    range whose values in a column are all NULL has an object column even if the column is numeric or a datetime in
+    the other ranges. Each column is cast to the dtype of the ranges holding values, or float64 for an integer column
+    with NULLs, as when the query is read in one piece.
+    :param frames:
+    :return:
+    """
+    if len(frames) < 2:
+        return pd.concat(frames, ignore_index=True)
+
+    frames = [frame.copy(deep=False) for frame in frames]
+    for col in frames[0].columns:
+        with_values = [frame[col] for frame in frames if frame[col].notna().any()]
+        if not with_values:
+            continue
+        dtype = pd.concat([series.iloc[:0] for series in with_values]).dtype
+        has_nulls = any(frame[col].isna().any() for frame in frames)
+        if has_nulls and pd.api.types.is_integer_dtype(dtype):
+            dtype = np.dtype("float64")
+        elif has_nulls and pd.api.types.is_bool_dtype(dtype):
+            dtype = np.dtype("object")
+        for frame in frames:
+            if frame[col].dtype != dtype:
+                frame[col] = frame[col].astype(dtype)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+@lru_cache(maxsize=1024)
+def get_executemany_upsert_statement(
+    table_name: str, columns: Tuple[str, ...], primary_key: Tuple[str, ...], on_duplicate_key_update: bool
+) -> str:
+    """
+    Returns a parameterized INSERT statement for use with executemany and positional parameter tuples. The statements
+    are cached, so the cost of building them is paid once per table and set of columns rather than once per batch.
+    :param table_name:
+    :param columns:
+    :param primary_key:
+    :param on_duplicate_key_update:
+    :return:
+    """
+    return get_insert_statement(table_name, columns, primary_key, on_duplicate_key_update, 1)
+
+
+def get_insert_statement(
+    table_name: str,
+    columns: Tuple[str, ...],
+    primary_key: Tuple[str, ...],
+    on_duplicate_key_update: bool,
+    row_count: int,
+) -> str:
+    """
+    Returns a parameterized multi-row INSERT statement with a VALUES group for each of row_count rows, executed once
+    with the parameter tuples of the rows flattened into a single sequence. Only the fragments of the statement are
+    cached, the VALUES list is built for each batch.
+    :param table_name:
+    :param columns:
+    :param primary_key:
+    :param on_duplicate_key_update:
+    :param row_count:
+    :return:
+    """
+    prefix, values, suffix = _get_insert_statement_parts(table_name, columns, primary_key, on_duplicate_key_update)
+    return prefix + ", ".join(itertools.repeat(values, row_count)) + suffix
+
+
+@lru_cache(maxsize=1024)
+def _get_insert_statement_parts(
+    table_name: str, columns: Tuple[str, ...], primary_key: Tuple[str, ...], on_duplicate_key_update: bool
+) -> Tuple[str, str, str]:
+    def quote(name: str) -> str:
+        # the statement is executed with parameters, so literal percent signs must be escaped
+        return "`{}`".format(name.replace("`", "``").replace("%", "%%"))
+
+    prefix = "INSERT INTO {} ({}) VALUES ".format(quote(table_name), ", ".join(quote(col) for col in columns))
+    values = "({})".format(", ".join("%s" for _ in columns))
+    update_cols = [col for col in columns if col not in primary_key]
+    suffix = ""
+    if on_duplicate_key_update and update_cols:
+        suffix = " ON DUPLICATE KEY UPDATE {}".format(
+            ", ".join(f"{quote(col)} = VALUES({quote(col)})" for col in update_cols)
+        )
+
+    return prefix, values, suffix
+
+
+LOAD_DATA_NULL = "\\N"
+
+
+def write_load_data_file(file_handle: TextIO, rows: Iterable[Sequence[Any]]):
+    """
+    Writes rows of cleaned values, one per column, as CSV in the format expected by get_load_data_statement. NULLs
+    are encoded as \\N and backslashes are escaped, since LOAD DATA treats backslash as the escape character.
+    :param file_handle:
+    :param rows:
+    :return:
+    """
+    writer = csv.writer(file_handle, lineterminator="\n")
+    for row in rows:
+        writer.writerow([_to_load_data_value(val) for val in row])
+
+
+def _to_load_data_value(val: Any) -> str:
+    if val is None:
+        return LOAD_DATA_NULL
+    elif isinstance(val, bool):
+        return "1" if val else "0"
+    elif isinstance(val, datetime.datetime):
+        return val.isoformat(sep=" ")
+    elif isinstance(val, bytes):
+        val = val.decode("utf-8")
+    return str(val).replace("\\", "\\\\")
+
+
+def get_load_data_statement(table_name: str, columns: Sequence[str], file_path: str, replace: bool) -> str:
+    """
+    Builds a LOAD DATA LOCAL INFILE statement for a file produced by write_load_data_file. Duplicate keys either
+    replace the existing row, or are skipped.
+    :param table_name:
+    :param columns:
+    :param file_path:
+    :param replace:
+    :return:
+    """
+    escaped_path = file_path.replace("\\", "\\\\").replace("'", "\\'")
+    return f"""
+        LOAD DATA LOCAL INFILE '{escaped_path}'
+        {'REPLACE' if replace else 'IGNORE'} INTO TABLE `{table_name}`
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+        ({', '.join(f'`{col}`' for col in columns)})
+    """
+
+
+def to_sql_literal(val: Any) -> str:
+    """
+    Renders a key value read from the database as a SQL literal, for use in generated WHERE clauses.
+    :param val:
+    :return:
+    """
+    if val is None:
+        return "NULL"
+    elif isinstance(val, bool):
+        return "TRUE" if val else "FALSE"
+    elif isinstance(val, (int, float, decimal.Decimal)):
+        return str(val)
+    elif isinstance(val, (bytes, bytearray)):
+        return f"X'{bytes(val).hex()}'"
+    elif isinstance(val, datetime.datetime):
+        return f"'{val.isoformat(sep=' ')}'"
+    elif isinstance(val, datetime.date):
+        return f"'{val.isoformat()}'"
+    else:
+        escaped = str(val).replace("\\", "\\\\").replace("'", "''")
+        return f"'{escaped}'"
 
 
 def get_existing_pks(engine: Engine, table: Table) -> Mapping[int, dict]:
@@ -71,27 +540,40 @@ def infer_table_schema(
     table_name: str,
     rows: Iterable[dict],
     primary_key: Optional[List[str]],
-):
-    # generate and execute a create table statement
+) -> Table:
+    """
+    Generate and execute a create table statement, inferring column types from rows. Callers writing large inputs
+    should pass a bounded sample, since rows is fully materialized.
+
+    Since values after the sample are not seen, string columns are created as TEXT, which holds values of any length.
+    String primary key columns must have a length to be indexed, and are created as VARCHAR of twice the longest value
+    in the sample, and at least MIN_KEY_STRING_LENGTH, so writing a longer key later fails.
+    :param metadata:
+    :param table_name:
+    :param rows:
+    :param primary_key:
+    :return:
+    """
     cols_to_types = {}
     columns = rows_to_columns(rows)
     for col_name, list_of_values in columns.items():
         # Just take the first value to by the type
-        first_non_null = None
-        for val in list_of_values:
-            if val is not None:
-                first_non_null = val
-                break
-            raise ValueError("Cannot provide an empty list, types cannot be inferred")
-        cols_to_types[col_name] = _get_col_type(first_non_null, list_of_values)
+        first_non_null = next((val for val in list_of_values if val is not None), None)
+        if first_non_null is None:
+            raise ValueError(f"Column {col_name} has no non-null values, types cannot be inferred")
+        is_key = col_name in (primary_key or [])
+        cols_to_types[col_name] = _get_col_type(first_non_null, list_of_values, is_key)
 
     table = _get_table_def(metadata, table_name, cols_to_types, primary_key)
     table.create()
+    return table
 
 
-def _get_col_type(sample_value: Any, values: Any):
+def _get_col_type(sample_value: Any, values: Any, is_key: bool = False):
     if isinstance(sample_value, str):
-        return String(2 * max(len(val) for val in values))
+        if not is_key:
+            return Text
+        return String(max(2 * max(len(val) for val in values if val is not None), MIN_KEY_STRING_LENGTH))
     elif isinstance(sample_value, int):
         return Integer
     elif isinstance(sample_value, float):
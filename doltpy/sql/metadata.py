@@ -0,0 +1,93 @@
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import MetaData, Table  # type: ignore
+from sqlalchemy.engine import Connection, Engine  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DDL_STATEMENT_PREFIXES = ("CREATE", "ALTER", "DROP", "RENAME")
+
+
+def get_table_schema_hash(conn: Connection, table_name: str) -> Optional[str]:
+    """
+    Returns a hash of the column definitions of the table in the current database, or None if the table does not exist.
+    This is much cheaper than reflecting the table, and changes whenever a column is added, dropped or altered.
+    :param conn:
+    :param table_name:
+    :return:
+    """
+    query = """
+        SELECT
+            column_name, column_type, is_nullable, column_key, column_default, extra
+        FROM
+            information_schema.columns
+        WHERE
+            table_schema = DATABASE() AND table_name = %s
+        ORDER BY
+            ordinal_position
+    """
+    columns = [tuple(row) for row in conn.execute(query, (table_name,))]
+    if not columns:
+        return None
+    return hashlib.sha1(repr(columns).encode("utf-8")).hexdigest()
+
+
+def is_ddl(sql: str) -> bool:
+    return sql.lstrip().upper().startswith(DDL_STATEMENT_PREFIXES)
+
+
+class TableMetadataCache:
+    """
+    Caches reflected table definitions for an engine. Only the tables requested are reflected, rather than the whole
+    database, and a cached definition is reflected again when the hash of the table's columns in the working set
+    changes, for example after DDL from another client or checking out a different branch.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.metadata = MetaData(bind=engine)
+        self.schema_hashes: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def get_table(self, table_name: str) -> Optional[Table]:
+        """
+        Returns the table definition, or None if the table does not exist.
+        :param table_name:
+        :return:
+        """
+        with self.lock:
+            with self.engine.connect() as conn:
+                schema_hash = get_table_schema_hash(conn, table_name)
+                if schema_hash is None:
+                    self._remove(table_name)
+                    return None
+
+                if self.schema_hashes.get(table_name) != schema_hash:
+                    logger.info(f"Reflecting table {table_name}")
+                    self._remove(table_name)
+                    self.metadata.reflect(bind=conn, only=[table_name])
+                    self.schema_hashes[table_name] = schema_hash
+
+            return self.metadata.tables[table_name]
+
+    def invalidate(self, table_or_tables: Optional[List[str]] = None):
+        """
+        Drops the given tables from the cache, or every table if none are given.
+        :param table_or_tables:
+        :return:
+        """
+        with self.lock:
+            if table_or_tables is None:
+                self.metadata.clear()
+                self.schema_hashes.clear()
+            else:
+                for table_name in table_or_tables:
+                    self._remove(table_name)
+
+    def _remove(self, table_name: str):
+        self.schema_hashes.pop(table_name, None)
+        if table_name in self.metadata.tables:
+            self.metadata.remove(self.metadata.tables[table_name])
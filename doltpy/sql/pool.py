@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import event  # type: ignore
+from sqlalchemy.engine import Engine  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    peak_checked_out: int
+    connects: int
+    checkouts: int
+    waits: int
+    wait_seconds: float
+    invalidations: int
+
+
+class PoolMonitor:
+    """
+    Collects statistics about an engine's connection pool from pool events. A wait is counted when a connection is
+    requested while every connection the pool may open, pool_size plus max_overflow, is checked out, and wait_seconds
+    is the total time spent acquiring those connections.
+    """
+
+    def __init__(self, engine: Engine, pool_size: int, max_overflow: int):
+        self.engine = engine
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.connects, self.checkouts, self.waits, self.invalidations = 0, 0, 0, 0
+        self.wait_seconds = 0.0
+        self.lock = threading.Lock()
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """
+        Wraps the acquisition of a connection, recording it as a wait if the pool is exhausted.
+        :return:
+        """
+        with self.lock:
+            exhausted = self.max_overflow >= 0 and self.checked_out >= self.pool_size + self.max_overflow
+        start = time.perf_counter()
+        yield
+        if exhausted:
+            with self.lock:
+                self.waits += 1
+                self.wait_seconds += time.perf_counter() - start
+
+    def stats(self) -> PoolStats:
+        with self.lock:
+            overflow = self.engine.pool.overflow() if hasattr(self.engine.pool, "overflow") else 0
+            return PoolStats(
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                checked_out=self.checked_out,
+                overflow=max(0, overflow),
+                peak_checked_out=self.peak_checked_out,
+                connects=self.connects,
+                checkouts=self.checkouts,
+                waits=self.waits,
+                wait_seconds=self.wait_seconds,
+                invalidations=self.invalidations,
+            )
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self.lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self.lock:
+            self.invalidations += 1
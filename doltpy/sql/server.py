@@ -0,0 +1,59 @@
+import logging
+import socket
+import time
+from subprocess import Popen
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STARTUP_TIMEOUT = 30.0
+INITIAL_PROBE_DELAY, MAX_PROBE_DELAY = 0.001, 0.1
+
+
+class ServerStartupError(RuntimeError):
+    """
+    Raised when a Dolt SQL Server process exits, or does not accept connections, before it is ready.
+    """
+
+
+def is_port_open(host: str, port: int) -> bool:
+    """
+    Returns True if a TCP connection to the port can be opened. Servers listening on all interfaces are probed on the
+    loopback interface.
+    :param host:
+    :param port:
+    :return:
+    """
+    probe_host = "127.0.0.1" if host in ("0.0.0.0", "") else host
+    try:
+        with socket.create_connection((probe_host, int(port)), timeout=MAX_PROBE_DELAY):
+            return True
+    except OSError:
+        return False
+
+
+def poll_until_ready(
+    probe: Callable[[], bool], proc: Optional[Popen] = None, timeout: float = DEFAULT_STARTUP_TIMEOUT
+) -> float:
+    """
+    Calls probe until it returns True, backing off exponentially from a millisecond to MAX_PROBE_DELAY between calls,
+    and returns the number of seconds waited. Raises ServerStartupError if proc exits first, or if the probe does not
+    succeed within timeout seconds.
+    :param probe:
+    :param proc:
+    :param timeout:
+    :return:
+    """
+    start = time.perf_counter()
+    delay = INITIAL_PROBE_DELAY
+    while True:
+        if proc is not None and proc.poll() is not None:
+            raise ServerStartupError(f"Dolt SQL Server exited with code {proc.returncode} before it was ready")
+        if probe():
+            return time.perf_counter() - start
+
+        elapsed = time.perf_counter() - start
+        if elapsed >= timeout:
+            raise ServerStartupError(f"Dolt SQL Server was not ready after {elapsed:.1f}s")
+        time.sleep(min(delay, timeout - elapsed))
+        delay = min(delay * 2, MAX_PROBE_DELAY)
@@ -0,0 +1,206 @@
+import io
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection  # type: ignore
+
+from ..cli import Dolt
+from ..sql.pool import PoolStats
+from ..sql.sql import DoltSQLServerContext, ServerConfig
+from ..sql.supervisor import ServerMetrics
+
+logger = logging.getLogger(__name__)
+
+ROUTING_ROUND_ROBIN = "round_robin"
+ROUTING_LEAST_LOADED = "least_loaded"
+ROUTINGS = (ROUTING_ROUND_ROBIN, ROUTING_LEAST_LOADED)
+
+DEFAULT_REPLICAS = 2
+
+# the commit a server's HEAD points to and whether its working set has changes, reads go to a replica only when it
+# serves the same commit as the primary and neither has changes
+_STATE_QUERY = "SELECT HASHOF('HEAD') AS head, (SELECT COUNT(*) FROM dolt_status) AS changes"
+
+
+class DoltSQLServerPool(DoltSQLServerContext):
+    """
+    Runs a writable primary Dolt SQL Server along with read-only replica servers, and serves reads from the replicas
+    behind the API of DoltSQLContext. Writes, commits, write sessions and the commit log go to the primary, queries that
+    only read, including every read_*, iter_* and diff method, to a replica chosen for each connection, so the ranges of
+    a parallel read_pandas are spread over the replicas.
+
+        with DoltSQLServerPool(dolt, ServerConfig(user="root", port=3306), replicas=4) as pool:
+            prices = pool.read_pandas("prices", parallelism=4)
+
+    Replicas listen on the ports following the primary's. By default DEFAULT_REPLICAS of them are started, each on a
+    copy of the repository taken when the pool is entered, which is removed when it exits, so no server must be running
+    on the repository at that point. Existing clones can be served instead by passing their directories as
+    replica_dirs, one replica each, in which case replicas, if given, must match their number.
+
+    Replicas only serve the commit they were started on, so before each read the primary's HEAD and working set are
+    checked, and the read goes to the primary unless a replica serves the same commit and there are no uncommitted
+    changes. Reads therefore always see writes made through the pool, and are spread over the replicas for as long as
+    the primary's HEAD has not moved since the pool was entered.
+
+    With round_robin routing replicas are used in turn, with least_loaded routing the replica with the fewest
+    connections checked out by this pool is used, in turn among equally loaded replicas.
+    """
+
+    def __init__(
+        self,
+        dolt: Dolt,
+        server_config: ServerConfig,
+        replicas: Optional[int] = None,
+        routing: str = ROUTING_ROUND_ROBIN,
+        replica_dirs: Optional[List[str]] = None,
+    ):
+        if routing not in ROUTINGS:
+            raise ValueError(f"routing must be one of {ROUTINGS}, got {routing}")
+        if server_config.daemon:
+            raise ValueError("DoltSQLServerPool starts its own replicas, so daemon mode is not supported")
+        if server_config.config:
+            raise ValueError("DoltSQLServerPool configures the port of each replica, so a config file is not supported")
+        self.replica_repos: Optional[List[Dolt]] = None
+        if replica_dirs:
+            if replicas is not None and replicas != len(replica_dirs):
+                raise ValueError(f"replicas is {replicas}, but {len(replica_dirs)} replica_dirs were given")
+            self.replica_repos = [Dolt(replica_dir) for replica_dir in replica_dirs]
+            replicas = len(self.replica_repos)
+        elif replicas is None:
+            replicas = DEFAULT_REPLICAS
+        if replicas < 1:
+            raise ValueError(f"replicas must be a positive integer, got {replicas}")
+
+        super().__init__(dolt, server_config)
+        self.routing = routing
+        self.replica_count = replicas
+        self.replicas: List[DoltSQLServerContext] = []
+        self.replica_states: List[Tuple[str, bool]] = []
+        self.clone_dir: Optional[str] = None
+        self.lock = threading.Lock()
+        self.turn = itertools.count()
+
+    def _get_replica_config(self, index: int) -> ServerConfig:
+        port = self.server_config.port + index + 1
+        log_file = self.server_config.log_file
+        if log_file is None:
+            log_file = os.path.join(self.dolt.repo_dir, f"mysql_server_{port}.log")
+        elif not isinstance(log_file, io.IOBase):
+            root, ext = os.path.splitext(log_file)
+            log_file = f"{root}_{port}{ext}"
+        return replace(self.server_config, port=port, readonly=True, log_file=log_file)
+
+    def _clone_repo(self) -> List[Dolt]:
+        """
+        Copies the repository once for each replica into a temporary directory. The copies keep the name of the
+        repository's directory, which is the name of the database served.
+        :return:
+        """
+        self.clone_dir = tempfile.mkdtemp(prefix="doltpy_replicas_")
+        repo_name = os.path.basename(os.path.normpath(self.dolt.repo_dir))
+        repos = []
+        for i in range(self.replica_count):
+            repo_dir = os.path.join(self.clone_dir, str(i), repo_name)
+            shutil.copytree(self.dolt.repo_dir, repo_dir)
+            repos.append(Dolt(repo_dir))
+        logger.info(f"Copied {self.dolt.repo_dir} to {self.clone_dir} for {self.replica_count} replicas")
+        return repos
+
+    def _remove_clones(self):
+        if self.clone_dir is not None:
+            shutil.rmtree(self.clone_dir, ignore_errors=True)
+            self.clone_dir = None
+
+    def __enter__(self):
+        repos = self.replica_repos if self.replica_repos is not None else self._clone_repo()
+        self.replicas = [DoltSQLServerContext(repo, self._get_replica_config(i)) for i, repo in enumerate(repos)]
+        try:
+            super().__enter__()
+        except BaseException:
+            self._remove_clones()
+            raise
+
+        started: List[DoltSQLServerContext] = []
+        try:
+            for replica in self.replicas:
+                replica.__enter__()
+                started.append(replica)
+            # replicas are read-only, so the state each serves is fixed once it has started
+            self.replica_states = [_get_state(replica) for replica in self.replicas]
+        except BaseException:
+            for replica in reversed(started):
+                replica.__exit__()
+            super().__exit__()
+            self._remove_clones()
+            raise
+
+        logger.info(f"Started {len(self.replicas)} read-only replicas with {self.routing} routing")
+        return self
+
+    def __exit__(self, *args):
+        for replica in reversed(self.replicas):
+            if replica.server is not None:
+                replica.__exit__()
+        super().__exit__(*args)
+        self._remove_clones()
+
+    @contextmanager
+    def _connect_for_read(self) -> Iterator[Connection]:
+        replica = self._get_replica()
+        if replica is None:
+            with self._connect() as conn:
+                yield conn
+        else:
+            with replica._connect() as conn:
+                yield conn
+
+    def _get_replica(self) -> Optional[DoltSQLServerContext]:
+        """
+        Returns the replica to read from, or None if no replica serves the primary's HEAD without changes, in which case
+        the read goes to the primary.
+        :return:
+        """
+        head, changes = _get_state(self)
+        if changes:
+            logger.debug("Reading from the primary, its working set has uncommitted changes")
+            return None
+        current = [replica for replica, state in zip(self.replicas, self.replica_states) if state == (head, False)]
+        if not current:
+            logger.debug(f"Reading from the primary, no replica serves its HEAD {head}")
+            return None
+
+        with self.lock:
+            turn = next(self.turn)
+        offset = turn % len(current)
+        replicas = current[offset:] + current[:offset]
+        if self.routing == ROUTING_ROUND_ROBIN:
+            return replicas[0]
+        # the count is read without the monitor's lock, a stale value only costs a slightly uneven choice
+        return min(replicas, key=lambda replica: replica.pool_monitor.checked_out)
+
+    def replica_pool_stats(self) -> List[PoolStats]:
+        """
+        Returns statistics about the connection pool of each replica, in the order of the replicas.
+        :return:
+        """
+        return [replica.pool_stats() for replica in self.replicas]
+
+    def replica_metrics(self) -> List[Optional[ServerMetrics]]:
+        """
+        Returns the latest resource usage sample of each replica's server process, in the order of the replicas.
+        :return:
+        """
+        return [replica.server_metrics() for replica in self.replicas]
+
+
+def _get_state(context: DoltSQLServerContext) -> Tuple[str, bool]:
+    with context._connect() as conn:
+        row = conn.execute(_STATE_QUERY).first()
+    return row["head"], row["changes"] > 0
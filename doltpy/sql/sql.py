@@ -1,31 +1,99 @@
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import partial
 import csv
 import io
+import itertools
 import logging
-import math
 import os
 import datetime
+import tempfile
+import time
 
 from subprocess import STDOUT, Popen
-from typing import Any, Dict, Iterable, List, Mapping, Union, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple, Union, Optional
 
 import pandas as pd  # type: ignore
+import psutil  # type: ignore
+import pyarrow as pa  # type: ignore
 import sqlalchemy as sa  # type: ignore
-import numpy as np  # type: ignore
 from retry import retry
 from sqlalchemy import create_engine  # type: ignore
-from sqlalchemy.engine import Engine  # type: ignore
-from sqlalchemy.dialects.mysql import insert  # type: ignore
+from sqlalchemy.engine import Connection, Engine  # type: ignore
 
 from ..cli import Dolt, Commit
-from ..shared import columns_to_rows, rows_to_columns, to_list
-from ..sql.helpers import infer_table_schema, clean_types
+from ..shared import batch_iterable, to_list
+from ..sql.batching import DEFAULT_BATCH_TARGET_SECONDS, AdaptiveBatchSizer, write_batch_adaptive
+from ..sql.cache import ResultCache, normalize_sql
+from ..sql.commit_graph import CommitGraph
+from ..sql.daemon import DEFAULT_DAEMON_IDLE_TIMEOUT, ServerDaemon
+from ..sql.changeset import (
+    DIFF_TYPE_ADDED,
+    DIFF_TYPE_MODIFIED,
+    DIFF_TYPE_REMOVED,
+    TableChangeset,
+    get_changeset_query,
+)
+from ..sql.metadata import TableMetadataCache, is_ddl
+from ..sql.pool import PoolMonitor, PoolStats
+from ..sql.server import DEFAULT_STARTUP_TIMEOUT, is_port_open, poll_until_ready
+from ..sql.supervisor import (
+    DEFAULT_DRAIN_TIMEOUT,
+    DEFAULT_MAX_RESTARTS,
+    DEFAULT_METRICS_INTERVAL,
+    ServerMetrics,
+    ServerSupervisor,
+    sample_process_metrics,
+    terminate_process,
+)
+from ..sql.helpers import (
+    infer_table_schema,
+    concat_frames,
+    clean_columns,
+    iter_column_batches,
+    get_executemany_upsert_statement,
+    get_insert_statement,
+    get_load_data_statement,
+    write_load_data_file,
+    ColumnBuffer,
+    finish_column_buffer,
+    get_arrow_type,
+    get_column_buffer,
+    iter_cursor_batches,
+    to_sql_literal,
+    rows_to_record_batch,
+    record_batches_to_table,
+)
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_HOST, DEFAULT_PORT = "127.0.0.1", 3306
 DEFAULT_BATCH_SIZE = 100000
+DEFAULT_SCHEMA_SAMPLE_SIZE = 1000
+DEFAULT_READ_BATCH_SIZE = 10000
+
+# Write modes, "insert" issues multi-row INSERT statements, "executemany" sends rows as parameter tuples to a cached
+# parameterized upsert, "load_data" streams each batch as CSV via LOAD DATA LOCAL INFILE, which requires
+# ServerConfig.allow_local_infile
+WRITE_MODE_INSERT, WRITE_MODE_EXECUTEMANY, WRITE_MODE_LOAD_DATA = "insert", "executemany", "load_data"
+WRITE_MODES = (WRITE_MODE_INSERT, WRITE_MODE_EXECUTEMANY, WRITE_MODE_LOAD_DATA)
+
+DRIVER_MYSQLCONNECTOR = "mysqlconnector"
+DRIVER_PYMYSQL = "pymysql"
+DRIVERS = (DRIVER_MYSQLCONNECTOR, DRIVER_PYMYSQL)
+DEFAULT_POOL_SIZE, DEFAULT_MAX_OVERFLOW = 5, 10
+
+
+class BatchWriteError(Exception):
+    """
+    Raised by parallel writes, collecting the exception raised by each batch that failed.
+    """
+
+    def __init__(self, errors: List[BaseException]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} batch(es) failed to write, first error: {errors[0]!r}")
 
 
 @dataclass
@@ -44,6 +112,30 @@ class ServerConfig:
     max_connections: Optional[int] = None
     log_file: Optional[str] = None
     echo: bool = False
+    allow_local_infile: bool = False
+    # when set, writes are batched by estimated size in bytes rather than by batch_size rows, see AdaptiveBatchSizer
+    batch_target_bytes: Optional[int] = None
+    batch_target_seconds: float = DEFAULT_BATCH_TARGET_SECONDS
+    # when set, reads pinned to commit hashes are cached up to this many bytes, see ResultCache
+    result_cache_bytes: Optional[int] = None
+    # connection pool and driver options, see _get_engine
+    driver: str = DRIVER_MYSQLCONNECTOR
+    pool_size: int = DEFAULT_POOL_SIZE
+    max_overflow: int = DEFAULT_MAX_OVERFLOW
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    compression: bool = False
+    connect_timeout: Optional[int] = None
+    # seconds a started server has to accept connections, see DoltSQLServerContext.wait_until_ready
+    startup_timeout: float = DEFAULT_STARTUP_TIMEOUT
+    # when set, the server is shared by the contexts of every process using the repository, see ServerDaemon
+    daemon: bool = False
+    daemon_idle_timeout: float = DEFAULT_DAEMON_IDLE_TIMEOUT
+    # supervision of the server process, see ServerSupervisor, max_restarts of 0 disables restarts
+    metrics_interval: float = DEFAULT_METRICS_INTERVAL
+    max_restarts: int = DEFAULT_MAX_RESTARTS
+    drain_timeout: float = DEFAULT_DRAIN_TIMEOUT
 
 
 @dataclass
@@ -52,6 +144,19 @@ class DoltSQLContext:
     server_config: ServerConfig
     engine: Engine
 
+    def __post_init__(self):
+        self.metadata_cache = TableMetadataCache(self.engine)
+        self.pool_monitor = PoolMonitor(self.engine, self.server_config.pool_size, self.server_config.max_overflow)
+        self.batch_sizer: Optional[AdaptiveBatchSizer] = None
+        if self.server_config.batch_target_bytes:
+            self.batch_sizer = AdaptiveBatchSizer(
+                self.server_config.batch_target_bytes, self.server_config.batch_target_seconds
+            )
+        self.commit_graph = CommitGraph()
+        self.result_cache: Optional[ResultCache] = None
+        if self.server_config.result_cache_bytes:
+            self.result_cache = ResultCache(self.server_config.result_cache_bytes)
+
     def _get_engine(self) -> Engine:
         """
         Get a connection to ths server process that this repo is running, raise an exception if it is not running.
@@ -65,19 +170,44 @@ class DoltSQLContext:
 
         logger.info(f"Creating engine for Dolt SQL Server instance running on {host}:{port}")
 
-        def inner():
-            if password is not None:
-                return create_engine(
-                    f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{database}",
-                    echo=self.server_config.echo,
-                )
-            else:
-                return create_engine(
-                    f"mysql+mysqlconnector://{user}@{host}:{port}/{database}",
-                    echo=self.server_config.echo,
-                )
+        credentials = f"{user}:{password}" if password is not None else f"{user}"
+        return create_engine(
+            f"mysql+{self.server_config.driver}://{credentials}@{host}:{port}/{database}",
+            echo=self.server_config.echo,
+            connect_args=self._get_connect_args(),
+            pool_size=self.server_config.pool_size,
+            max_overflow=self.server_config.max_overflow,
+            pool_timeout=self.server_config.pool_timeout,
+            pool_recycle=self.server_config.pool_recycle,
+            pool_pre_ping=self.server_config.pool_pre_ping,
+        )
+
+    def _get_connect_args(self) -> Dict[str, Any]:
+        """
+        Translates the driver options in the ServerConfig to the connect arguments of the configured driver.
+        :return:
+        """
+        driver = self.server_config.driver
+        if driver not in DRIVERS:
+            raise ValueError(f"driver must be one of {DRIVERS}, got {driver}")
+
+        connect_args: Dict[str, Any] = {}
+        if driver == DRIVER_MYSQLCONNECTOR:
+            if self.server_config.allow_local_infile:
+                connect_args["allow_local_infile"] = True
+            if self.server_config.compression:
+                connect_args["compress"] = True
+            if self.server_config.connect_timeout is not None:
+                connect_args["connection_timeout"] = self.server_config.connect_timeout
+        else:
+            if self.server_config.compression:
+                raise ValueError(f"Protocol compression is not supported by the {DRIVER_PYMYSQL} driver")
+            if self.server_config.allow_local_infile:
+                connect_args["local_infile"] = True
+            if self.server_config.connect_timeout is not None:
+                connect_args["connect_timeout"] = self.server_config.connect_timeout
 
-        return inner()
+        return connect_args
 
     @retry(
         delay=2,
@@ -93,6 +223,67 @@ class DoltSQLContext:
             conn.close()
             return True
 
+    @contextmanager
+    def _connect(self) -> Iterator[Connection]:
+        """
+        Provides the connection used for statements, by default a pooled connection that is released afterwards.
+        :return:
+        """
+        with self.pool_monitor.acquire():
+            conn = self.engine.connect()
+        with conn:
+            yield conn
+
+    @contextmanager
+    def _connect_for_read(self) -> Iterator[Connection]:
+        """
+        Provides the connection used for queries that only read, by default the same as _connect. Contexts that serve
+        reads from replicas override it.
+        :return:
+        """
+        with self._connect() as conn:
+            yield conn
+
+    def pool_stats(self) -> PoolStats:
+        """
+        Returns statistics about the connection pool, for sizing it with ServerConfig.pool_size and max_overflow.
+        :return:
+        """
+        return self.pool_monitor.stats()
+
+    @contextmanager
+    def write_session(
+        self, commit_message: Optional[str] = None, allow_empty: bool = False
+    ) -> Iterator["DoltSQLWriteSession"]:
+        """
+        Returns a session whose reads and writes all run on a single connection inside one SQL transaction. When the
+        block exits the tables written are added and committed with DOLT_COMMIT, if a commit_message is given, and the
+        transaction is committed. If the block raises the transaction is rolled back, leaving the working set as it was.
+        The hash of the Dolt commit is available as commit_hash on the session afterwards.
+
+            with dssc.write_session("Load prices") as session:
+                session.write_rows("prices", rows)
+                session.write_pandas("symbols", df)
+            print(session.commit_hash)
+
+        :param commit_message:
+        :param allow_empty:
+        :return:
+        """
+        with self.engine.connect() as conn:
+            transaction = conn.begin()
+            session = DoltSQLWriteSession(self, conn)
+            try:
+                yield session
+                if commit_message:
+                    session.commit_hash = DoltSQLContext.commit_tables(
+                        session, commit_message, session.tables_written, allow_empty
+                    )
+                transaction.commit()
+            except BaseException:
+                transaction.rollback()
+                raise
+
     def commit_tables(
         self,
         commit_message: Optional[str] = None,
@@ -101,13 +292,15 @@ class DoltSQLContext:
     ) -> str:
         tables = to_list(table_or_tables)
 
-        with self.engine.connect() as conn:
+        with self._connect() as conn:
             if tables:
-                for table in tables:
-                    conn.execute(f"CALL DOLT_ADD('{table}')")
+                dolt_add_args = ", ".join(f"'{table}'" for table in tables)
+                conn.execute(f"CALL DOLT_ADD({dolt_add_args})")
                 dolt_commit_args = f"'-m', '{commit_message}'"
             else:
                 dolt_commit_args = f"'-a', '-m', '{commit_message}'"
+            if allow_emtpy:
+                dolt_commit_args += ", '--allow-empty'"
             result = [dict(row) for row in conn.execute(f"CALL DOLT_COMMIT({dolt_commit_args})")]
             print(result)
             assert len(result) == 1, "Expected a single returned row with a commit hash"
@@ -120,9 +313,12 @@ class DoltSQLContext:
         commit_message: Optional[str] = None,
         allow_emtpy: bool = False,
     ) -> Optional[str]:
-        with self.engine.connect() as conn:
+        with self._connect() as conn:
             conn.execute(sql)
 
+        if is_ddl(sql):
+            self.invalidate_metadata()
+
         if commit:
             if not commit_message:
                 raise ValueError("Passed commit as True, but no commit message")
@@ -133,7 +329,7 @@ class DoltSQLContext:
     def write_columns(
         self,
         table: str,
-        columns: Mapping[str, List[Any]],
+        columns: Union[Mapping[str, Iterable[Any]], pa.Table],
         on_duplicate_key_update: bool = True,
         create_if_not_exists: bool = False,
         primary_key: Optional[List[str]] = None,
@@ -142,21 +338,52 @@ class DoltSQLContext:
         commit_date: Optional[datetime.datetime] = None,
         allow_empty: bool = False,
         batch_size: int = DEFAULT_BATCH_SIZE,
+        write_mode: str = WRITE_MODE_INSERT,
+        parallelism: int = 1,
     ):
+        """
+        Write columns to the table. Columns can be a pyarrow Table, or a mapping from column names to lists, NumPy
+        arrays, pandas Series or any other iterable. In every write mode each batch of parameter tuples, or of CSV, is
+        built directly from slices of the column buffers, without creating a dict per row. Parallel writes partition the
+        tuples by row, see _write_batches_parallel.
+        """
+        self._validate_write_args(write_mode, parallelism)
+        batches = iter_column_batches(columns, batch_size)
+        first_batch = next(batches, None)
+        if first_batch is not None:
+            batches = itertools.chain([first_batch], batches)
+
+        def get_sample() -> List[dict]:
+            if first_batch is None:
+                return []
+            names, batch = first_batch
+            return [dict(zip(names, vals)) for vals in itertools.islice(zip(*batch), DEFAULT_SCHEMA_SAMPLE_SIZE)]
+
+        sa_table = self._get_write_table(table, create_if_not_exists, primary_key, get_sample)
+
+        if first_batch is not None and parallelism > 1:
+            rows = (vals for _, batch in batches for vals in zip(*batch))
+            self._write_batches_parallel(
+                sa_table, first_batch[0], rows, on_duplicate_key_update, batch_size, write_mode, parallelism
+            )
+        else:
+            rows_written = 0
+            for names, batch in batches:
+                params = list(zip(*clean_columns(batch)))
+                write_params = partial(
+                    self._write_params,
+                    sa_table,
+                    names,
+                    on_duplicate_key_update=on_duplicate_key_update,
+                    write_mode=write_mode,
+                )
+                for chunk in self._get_batches(params, batch_size):
+                    logger.info(f"Writing records {rows_written} through {rows_written + len(chunk)} to Dolt")
+                    self._write_sized(chunk, write_params)
+                    rows_written += len(chunk)
 
-        rows = columns_to_rows(columns)
-        return self.write_rows(
-            table,
-            rows,
-            on_duplicate_key_update,
-            create_if_not_exists,
-            primary_key,
-            commit,
-            commit_message,
-            commit_date,
-            allow_empty,
-            batch_size,
-        )
+        if commit:
+            return self.commit_tables(commit_message, table, allow_empty)
 
     def write_file(
         self,
@@ -170,23 +397,26 @@ class DoltSQLContext:
         commit_date: Optional[datetime.datetime] = None,
         allow_empty: bool = False,
         batch_size: int = DEFAULT_BATCH_SIZE,
+        write_mode: str = WRITE_MODE_INSERT,
+        parallelism: int = 1,
     ):
 
         with open(file_path, "r") as file_handle:
             reader = csv.DictReader(file_handle)
-            rows = [row for row in reader]
-        return self.write_rows(
-            table,
-            rows,
-            on_duplicate_key_update,
-            create_if_not_exists,
-            primary_key,
-            commit,
-            commit_message,
-            commit_date,
-            allow_empty,
-            batch_size,
-        )
+            return self.write_rows(
+                table,
+                reader,
+                on_duplicate_key_update,
+                create_if_not_exists,
+                primary_key,
+                commit,
+                commit_message,
+                commit_date,
+                allow_empty,
+                batch_size,
+                write_mode=write_mode,
+                parallelism=parallelism,
+            )
 
     def write_pandas(
         self,
@@ -200,18 +430,17 @@ class DoltSQLContext:
         commit_date: Optional[datetime.datetime] = None,
         allow_empty: bool = False,
         batch_size: int = DEFAULT_BATCH_SIZE,
+        write_mode: str = WRITE_MODE_INSERT,
+        parallelism: int = 1,
     ):
-        dt_columns = df.select_dtypes(include=[np.datetime64]).columns
-        rows = df.to_dict("records")
-
-        for row in rows:
-            for column in dt_columns:
-                if pd.isna(row[column]):
-                    row[column] = None
-
-        return self.write_rows(
+        """
+        Write a DataFrame to the table. In every write mode, including the default "insert", the DataFrame is written
+        column-wise by write_columns, one batch_size slice at a time, with nulls (NaN, NaT, pd.NA) normalized to None
+        per column, so no list of records or dict per row is materialized.
+        """
+        return self.write_columns(
             table,
-            rows,
+            {col: df[col] for col in df.columns},
             on_duplicate_key_update,
             create_if_not_exists,
             primary_key,
@@ -220,6 +449,8 @@ class DoltSQLContext:
             commit_date,
             allow_empty,
             batch_size,
+            write_mode=write_mode,
+            parallelism=parallelism,
         )
 
     def write_rows(
@@ -234,28 +465,217 @@ class DoltSQLContext:
         commit_date: Optional[datetime.datetime] = None,
         allow_empty: bool = False,
         batch_size: int = DEFAULT_BATCH_SIZE,
+        write_mode: str = WRITE_MODE_INSERT,
+        parallelism: int = 1,
     ):
+        """
+        Write rows to the table in batches of batch_size. Rows are consumed lazily, so any iterable (including a
+        generator) can be passed and only a single batch is held in memory at a time. When the table is created the
+        schema is inferred from the first DEFAULT_SCHEMA_SAMPLE_SIZE rows, see infer_table_schema.
 
-        metadata = sa.MetaData(bind=self.engine)
-        metadata.reflect()
+        With write_mode "load_data" each batch is sent as a CSV file via LOAD DATA LOCAL INFILE, which is much faster
+        for large loads. Duplicate keys are handled with REPLACE when on_duplicate_key_update is set, and IGNORE
+        otherwise. Note that REPLACE overwrites the whole row, so columns missing from the rows are reset to defaults.
 
-        if table_name not in metadata.tables and create_if_not_exists:
-            infer_table_schema(metadata, table_name, rows, primary_key)
-            metadata.reflect()
+        With write_mode "executemany" a single parameterized upsert is compiled per table and set of columns, and cached
+        across batches and calls, so rows are passed to the driver as parameter tuples rather than being compiled into
+        one very large statement per batch.
 
-        table = metadata.tables[table_name]
+        Every row must have the same keys as the first, which are the columns written, and a row with other keys raises
+        a ValueError rather than having the missing columns written as NULL. Each row is converted to a tuple of values,
+        and each batch is cleaned column-wise and written as parameter tuples, as by write_columns.
 
-        rows = list(rows)
-        for i in range(max(1, math.ceil(len(rows) / batch_size))):
-            batch_start = i * batch_size
-            batch_end = min((i + 1) * batch_size, len(rows))
-            batch = rows[batch_start:batch_end]
-            logger.info(f"Writing records {batch_start} through {batch_end} of {len(rows)} rows to Dolt")
-            self._write_batch(table, batch, on_duplicate_key_update)
+        With parallelism greater than one batches are written concurrently over pooled connections, see
+        _write_batches_parallel for the ordering guarantees.
+
+        When ServerConfig.batch_target_bytes is set batches are sized by their estimated encoded size instead of by
+        batch_size, and the size adapts to statement latency and to statements the server rejects as too large.
+        """
+        self._validate_write_args(write_mode, parallelism)
+
+        rows = iter(rows)
+        sample: List[dict] = []
+
+        def get_sample() -> List[dict]:
+            sample.extend(itertools.islice(rows, DEFAULT_SCHEMA_SAMPLE_SIZE))
+            return sample
+
+        table = self._get_write_table(table_name, create_if_not_exists, primary_key, get_sample)
+        rows = itertools.chain(sample, rows)
+        first_row = next(rows, None)
+        if first_row is not None:
+            first_keys = first_row.keys()
+            names = list(first_keys)
+
+            def get_values(row: dict) -> tuple:
+                if row.keys() != first_keys:
+                    raise ValueError(f"Every row must have the columns {names}, got a row with {list(row.keys())}")
+                return tuple(row[col] for col in names)
+
+            values = map(get_values, itertools.chain([first_row], rows))
+            if parallelism > 1:
+                self._write_batches_parallel(
+                    table, names, values, on_duplicate_key_update, batch_size, write_mode, parallelism
+                )
+            else:
+                write_batch = partial(
+                    self._write_rows_batch,
+                    table,
+                    names,
+                    on_duplicate_key_update=on_duplicate_key_update,
+                    write_mode=write_mode,
+                )
+                rows_written = 0
+                for batch in self._get_batches(values, batch_size):
+                    logger.info(f"Writing records {rows_written} through {rows_written + len(batch)} to Dolt")
+                    self._write_sized(batch, write_batch)
+                    rows_written += len(batch)
 
         if commit:
             return self.commit_tables(commit_message, table_name, allow_empty)
 
+    def get_table(self, table_name: str) -> Optional[sa.Table]:
+        """
+        Returns the reflected definition of the table, or None if it does not exist. Definitions are cached, and only
+        reflected again when the table's schema changes.
+        :param table_name:
+        :return:
+        """
+        return self.metadata_cache.get_table(table_name)
+
+    def invalidate_metadata(self, table_or_tables: Optional[Union[str, List[str]]] = None):
+        """
+        Drops cached table definitions, for all tables if none are given. DDL run through execute does this
+        automatically.
+        :param table_or_tables:
+        :return:
+        """
+        self.metadata_cache.invalidate(to_list(table_or_tables))
+
+    def _validate_write_args(self, write_mode: str, parallelism: int):
+        if parallelism < 1:
+            raise ValueError(f"parallelism must be a positive integer, got {parallelism}")
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unexpected write mode {write_mode}, expected one of {WRITE_MODES}")
+        if write_mode == WRITE_MODE_LOAD_DATA and not self.server_config.allow_local_infile:
+            raise ValueError("Write mode 'load_data' requires ServerConfig.allow_local_infile to be set")
+
+    def _get_write_table(
+        self,
+        table_name: str,
+        create_if_not_exists: bool,
+        primary_key: Optional[List[str]],
+        get_sample: Callable[[], List[dict]],
+    ) -> sa.Table:
+        """
+        Reflects the table being written to, creating it with a schema inferred from the rows returned by get_sample if
+        it does not exist and create_if_not_exists is set. The sample is only requested when the table is created.
+        :param table_name:
+        :param create_if_not_exists:
+        :param primary_key:
+        :param get_sample:
+        :return:
+        """
+        table = self.get_table(table_name)
+        if table is None and create_if_not_exists:
+            infer_table_schema(sa.MetaData(bind=self.engine), table_name, get_sample(), primary_key)
+            table = self.get_table(table_name)
+
+        if table is None:
+            raise ValueError(f"Table {table_name} does not exist")
+
+        return table
+
+    def _get_batches(self, rows: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+        if self.batch_sizer is not None:
+            return self.batch_sizer.batches(rows)
+        return batch_iterable(rows, batch_size)
+
+    def _write_sized(self, batch: List[Any], write_batch: Callable[[List[Any]], None]):
+        if self.batch_sizer is not None:
+            write_batch_adaptive(self.batch_sizer, batch, write_batch)
+        else:
+            write_batch(batch)
+
+    def _write_batches_parallel(
+        self,
+        table: sa.Table,
+        columns: Sequence[str],
+        rows: Iterable[tuple],
+        on_duplicate_key_update: bool,
+        batch_size: int,
+        write_mode: str,
+        parallelism: int,
+    ):
+        """
+        Writes tuples of raw values, one per column, cleaning each batch column-wise when it is written. Rows are
+        partitioned on a hash of their primary key values (round robin for tables without a primary key), and
+        each partition has at most one batch in flight, so writes to a given key are applied in the order they were
+        passed. Once a batch fails no further batches are submitted, the in flight batches are allowed to finish, and
+        all failures are raised together as a BatchWriteError. At most 2 * parallelism batches are held in memory.
+        :param table:
+        :param columns:
+        :param rows:
+        :param on_duplicate_key_update:
+        :param batch_size:
+        :param write_mode:
+        :param parallelism:
+        :return:
+        """
+        pk_indexes = [columns.index(col.name) for col in table.primary_key.columns if col.name in columns]
+        buffers: List[List[tuple]] = [[] for _ in range(parallelism)]
+        buffer_bytes = [0] * parallelism
+        write_batch = partial(
+            self._write_rows_batch,
+            table,
+            columns,
+            on_duplicate_key_update=on_duplicate_key_update,
+            write_mode=write_mode,
+        )
+        in_flight: Dict[int, Future] = {}
+        errors: List[BaseException] = []
+
+        def wait_for(partition: int):
+            future = in_flight.pop(partition, None)
+            if future is not None:
+                exc = future.exception()
+                if exc is not None:
+                    errors.append(exc)
+
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+
+            def submit(partition: int):
+                wait_for(partition)
+                if not errors:
+                    batch, buffers[partition], buffer_bytes[partition] = buffers[partition], [], 0
+                    logger.info(f"Submitting batch of {len(batch)} rows for partition {partition}")
+                    in_flight[partition] = executor.submit(self._write_sized, batch, write_batch)
+
+            for i, row in enumerate(rows):
+                if pk_indexes:
+                    partition = hash(tuple(row[i] for i in pk_indexes)) % parallelism
+                else:
+                    partition = i % parallelism
+                buffers[partition].append(row)
+                if self.batch_sizer is not None:
+                    buffer_bytes[partition] += self.batch_sizer.row_bytes(row)
+                    if buffer_bytes[partition] >= self.batch_sizer.budget_bytes:
+                        submit(partition)
+                elif len(buffers[partition]) >= batch_size:
+                    submit(partition)
+                if errors:
+                    break
+
+            for partition, buffer in enumerate(buffers):
+                if buffer and not errors:
+                    submit(partition)
+
+            for partition in list(in_flight.keys()):
+                wait_for(partition)
+
+        if errors:
+            raise BatchWriteError(errors)
+
     @classmethod
     def _coerce_dates(cls, data: Iterable[dict]) -> List[dict]:
         """
@@ -276,55 +696,439 @@ class DoltSQLContext:
 
         return data_copy
 
-    def _write_batch(self, table: sa.Table, rows: List[dict], on_duplicate_key_update: bool):
-        rows = list(clean_types(rows))
-
+    def _write_rows_batch(
+        self,
+        table: sa.Table,
+        columns: Sequence[str],
+        rows: List[tuple],
+        on_duplicate_key_update: bool,
+        write_mode: str = WRITE_MODE_INSERT,
+    ):
         logger.info(f"Updating {len(rows)} rows")
-        with self.engine.connect() as conn:
-            statement = insert(table).values(rows)
-            if on_duplicate_key_update:
-                update_dict = {el.name: el for el in statement.inserted if not el.primary_key}
-                statement = statement.on_duplicate_key_update(update_dict)
+        params = list(zip(*clean_columns([list(values) for values in zip(*rows)])))
+        self._write_params(table, columns, params, on_duplicate_key_update, write_mode)
 
-            conn.execute(statement)
+    def _write_params(
+        self,
+        table: sa.Table,
+        columns: Sequence[str],
+        params: List[tuple],
+        on_duplicate_key_update: bool,
+        write_mode: str,
+    ):
+        """
+        Writes a batch of cleaned parameter tuples, one value per column, using the given write mode.
+        :param table:
+        :param columns:
+        :param params:
+        :param on_duplicate_key_update:
+        :param write_mode:
+        :return:
+        """
+        if write_mode == WRITE_MODE_INSERT:
+            self._insert_batch(table, columns, params, on_duplicate_key_update)
+        elif write_mode == WRITE_MODE_EXECUTEMANY:
+            self._executemany_batch(table, columns, params, on_duplicate_key_update)
+        elif write_mode == WRITE_MODE_LOAD_DATA:
+            self._load_data_batch(table, columns, params, on_duplicate_key_update)
+        else:
+            raise ValueError(f"Unexpected write mode {write_mode}, expected one of {WRITE_MODES}")
 
-    def read_columns(self, table: str, as_of: Optional[str] = None) -> Mapping[str, list]:
-        return self.read_columns_sql(self._get_read_table_asof_query(table, as_of))
+    def _insert_batch(
+        self, table: sa.Table, columns: Sequence[str], params: List[tuple], on_duplicate_key_update: bool
+    ):
+        pks = tuple(col.name for col in table.primary_key.columns)
+        statement = get_insert_statement(table.name, tuple(columns), pks, on_duplicate_key_update, len(params))
+        with self._connect() as conn:
+            # a single sequence of scalars is executed once, rather than as executemany
+            conn.execute(statement, tuple(itertools.chain.from_iterable(params)))
+
+    def _executemany_batch(
+        self, table: sa.Table, columns: Sequence[str], params: List[tuple], on_duplicate_key_update: bool
+    ):
+        pks = tuple(col.name for col in table.primary_key.columns)
+        statement = get_executemany_upsert_statement(table.name, tuple(columns), pks, on_duplicate_key_update)
+        with self._connect() as conn:
+            conn.execute(statement, params)
+
+    def _load_data_batch(
+        self, table: sa.Table, columns: Sequence[str], params: List[tuple], on_duplicate_key_update: bool
+    ):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, f"{table.name}.csv")
+            with open(file_path, "w", newline="") as file_handle:
+                write_load_data_file(file_handle, params)
+            with self._connect() as conn:
+                conn.execute(get_load_data_statement(table.name, columns, file_path, on_duplicate_key_update))
+
+    def read_columns(
+        self, table: str, as_of: Optional[str] = None, batch_size: int = DEFAULT_READ_BATCH_SIZE, typed: bool = False
+    ) -> Mapping[str, ColumnBuffer]:
+        return self.read_columns_sql(self._get_read_table_asof_query(table, as_of), batch_size, typed)
 
     def read_rows(self, table: str, as_of: Optional[str] = None) -> List[dict]:
-        return self.read_rows_sql(self._get_read_table_asof_query(table, as_of))
+        return self.read_rows_sql(self._get_read_table_asof_query(table, as_of), commits=to_list(as_of))
 
-    def read_pandas(self, table: str, as_of: Optional[str] = None) -> pd.DataFrame:
-        return self.read_pandas_sql(self._get_read_table_asof_query(table, as_of))
+    def read_pandas(self, table: str, as_of: Optional[str] = None, parallelism: int = 1) -> pd.DataFrame:
+        """
+        Reads the table into a DataFrame. With parallelism greater than one the table is split into that many ranges of
+        the leading column of its primary key, which are read concurrently on separate connections and concatenated in
+        primary key order, with each column cast to a common dtype, see concat_frames.
+
+        Every range is read as of the same commit, so that the ranges are consistent with each other. Without as_of,
+        the hash of HEAD is resolved once and used for every range, so a parallel read does not see uncommitted changes
+        in the working set.
+        :param table:
+        :param as_of:
+        :param parallelism:
+        :return:
+        """
+        self._validate_read_parallelism(parallelism)
+        if parallelism == 1:
+            return self.read_pandas_sql(self._get_read_table_asof_query(table, as_of), commits=to_list(as_of))
+
+        if as_of is None:
+            with self._connect_for_read() as conn:
+                as_of = conn.execute("SELECT HASHOF('HEAD')").scalar()
+        queries = self._get_partition_queries(table, as_of, parallelism)
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            frames = list(executor.map(partial(self.read_pandas_sql, commits=to_list(as_of)), queries))
+        return concat_frames(frames)
+
+    def _validate_read_parallelism(self, parallelism: int):
+        if parallelism < 1:
+            raise ValueError(f"parallelism must be a positive integer, got {parallelism}")
+
+    def _get_partition_queries(self, table: str, as_of: Optional[str], parallelism: int) -> List[str]:
+        """
+        Returns queries reading consecutive ranges of the leading primary key column, each ordered by the primary key.
+        Tables without a primary key are read by a single query.
+        :param table:
+        :param as_of:
+        :param parallelism:
+        :return:
+        """
+        sa_table = self.get_table(table)
+        if sa_table is None:
+            raise ValueError(f"Table {table} does not exist")
+
+        base_query = self._get_read_table_asof_query(table, as_of)
+        pk_cols = [col.name for col in sa_table.primary_key.columns]
+        if not pk_cols:
+            logger.warning(f"Table {table} has no primary key, reading it with a single query")
+            return [base_query]
+
+        key = f"`{pk_cols[0]}`"
+        order_by = ", ".join(f"`{col}`" for col in pk_cols)
+        bounds = [None, *self._get_partition_boundaries(table, as_of, key, parallelism), None]
+        queries = []
+        for lower, upper in zip(bounds, bounds[1:]):
+            conditions = []
+            if lower is not None:
+                conditions.append(f"{key} >= {to_sql_literal(lower)}")
+            if upper is not None:
+                conditions.append(f"{key} < {to_sql_literal(upper)}")
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+            queries.append(f"{base_query}{where} ORDER BY {order_by}")
+
+        return queries
+
+    def _get_partition_boundaries(self, table: str, as_of: Optional[str], key: str, parallelism: int) -> List[Any]:
+        """
+        Returns up to parallelism - 1 ascending values of the key that split the table into ranges. Integer keys are
+        split evenly between their minimum and maximum, other keys at every n-th key, so that the ranges hold the same
+        number of rows.
+        :param table:
+        :param as_of:
+        :param key:
+        :param parallelism:
+        :return:
+        """
+        source = self._get_table_asof(table, as_of)
+        with self._connect_for_read() as conn:
+            min_key, max_key = conn.execute(f"SELECT MIN({key}), MAX({key}) FROM {source}").fetchone()
+            if min_key is None:
+                return []
+            elif isinstance(min_key, int):
+                step = (max_key - min_key + 1) / parallelism
+                return sorted({min_key + int(step * i) for i in range(1, parallelism)} - {min_key})
+
+            row_count = conn.execute(f"SELECT COUNT(*) FROM {source}").scalar()
+            rows_per_partition = max(1, -(-row_count // parallelism))
+            result = conn.execute(
+                f"""
+                SELECT
+                    {key}
+                FROM
+                    (SELECT {key}, ROW_NUMBER() OVER (ORDER BY {key}) AS row_num FROM {source}) AS keys
+                WHERE
+                    row_num > 1 AND MOD(row_num - 1, {rows_per_partition}) = 0
+                ORDER BY
+                    row_num
+            """
+            )
+            # keys that are only the leading column of the primary key can repeat
+            return list(dict.fromkeys(row[0] for row in result))
 
     @classmethod
     def _get_read_table_asof_query(cls, table: str, as_of: Optional[str] = None) -> str:
-        base_query = f"SELECT * FROM `{table}`"
-        return f'{base_query} AS OF "{as_of}"' if as_of else base_query
+        return f"SELECT * FROM {cls._get_table_asof(table, as_of)}"
 
-    def read_columns_sql(self, sql: str) -> Mapping[str, list]:
-        rows = self._read_table_sql(sql)
-        columns = rows_to_columns(rows)
-        return columns
+    @classmethod
+    def _get_table_asof(cls, table: str, as_of: Optional[str] = None) -> str:
+        return f'`{table}` AS OF "{as_of}"' if as_of else f"`{table}`"
 
-    def read_rows_sql(self, sql: str) -> List[dict]:
-        return self._read_table_sql(sql)
+    def read_columns_sql(
+        self, sql: str, batch_size: int = DEFAULT_READ_BATCH_SIZE, typed: bool = False
+    ) -> Mapping[str, ColumnBuffer]:
+        """
+        Reads the result of the query into a list per column. Rows are fetched from the server in batches of batch_size
+        tuples, and each batch is appended column by column, without building a dict per row.
+
+        With typed set, integer and floating point columns are instead returned as NumPy masked arrays of int64, uint64
+        or float64 values, with NULLs masked, and other columns as lists. The type of each column depends only on its
+        SQL type, not on the values read.
+        :param sql:
+        :param batch_size:
+        :param typed:
+        :return:
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
 
-    def read_pandas_sql(self, sql: str) -> pd.DataFrame:
-        with self.engine.connect() as conn:
-            return pd.read_sql(sql, conn)
+        with self._unbuffered_cursor(sql) as cursor:
+            columns = [description[0] for description in cursor.description]
+            buffers = [get_column_buffer(description, typed) for description in cursor.description]
+            for batch in iter_cursor_batches(cursor, batch_size):
+                for buffer, values in zip(buffers, zip(*batch)):
+                    buffer.extend(values)
+
+        return {col: finish_column_buffer(buffer) for col, buffer in zip(columns, buffers)}
+
+    def read_rows_sql(self, sql: str, commits: Optional[List[str]] = None) -> List[dict]:
+        """
+        Reads the result of the query as a list of dicts. See _read_cached for commits.
+        :param sql:
+        :param commits:
+        :return:
+        """
+        return self._read_cached("rows", sql, commits, partial(self._read_table_sql, sql))
+
+    def read_pandas_sql(self, sql: str, commits: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads the result of the query into a DataFrame. See _read_cached for commits.
+        :param sql:
+        :param commits:
+        :return:
+        """
+
+        def read() -> pd.DataFrame:
+            with self._connect_for_read() as conn:
+                return pd.read_sql(sql, conn)
+
+        return self._read_cached("pandas", sql, commits, read)
+
+    def _read_cached(self, result_type: str, sql: str, commits: Optional[List[str]], read: Callable[[], Any]) -> Any:
+        """
+        Returns the result of read, from the result cache when it is enabled and the query is pinned to commits. Callers
+        pass the commits every table in the query is read as of, and the result is cached only if each of them is a
+        commit hash, since the result of a query on a branch, a tag or the working set can change. The cache key is the
+        normalized query along with the commit hashes.
+        :param result_type:
+        :param sql:
+        :param commits:
+        :param read:
+        :return:
+        """
+        if self.result_cache is None or not commits:
+            return read()
+
+        commit_hashes = [self._get_commit_hash(commit) for commit in commits]
+        if None in commit_hashes:
+            return read()
+
+        key = (self.database, result_type, normalize_sql(sql), tuple(commit_hashes))
+        result = self.result_cache.get(key)
+        if result is None:
+            result = read()
+            self.result_cache.put(key, result)
+        return result
+
+    def _get_commit_hash(self, ref: str) -> Optional[str]:
+        """
+        Returns ref if it is the hash of a commit in the database, otherwise None.
+        :param ref:
+        :return:
+        """
+        assert self.result_cache is not None
+        if ref in self.result_cache.commit_hashes or ref in self.commit_graph:
+            return ref
+
+        with self._connect() as conn:
+            try:
+                result = conn.execute("SELECT commit_hash FROM dolt_commits WHERE commit_hash = %s", (ref,)).fetchall()
+            except sa.exc.DBAPIError as e:
+                logger.warning(f"Failed to resolve {ref} to a commit hash, not caching: {e}")
+                return None
+
+        if not result:
+            return None
+        self.result_cache.commit_hashes.add(ref)
+        return ref
 
     def _read_table_sql(self, sql: str) -> List[dict]:
-        with self.engine.connect() as conn:
+        with self._connect_for_read() as conn:
             result = conn.execute(sql)
             return [dict(row) for row in result]
 
+    def iter_rows(
+        self, table: str, as_of: Optional[str] = None, batch_size: int = DEFAULT_READ_BATCH_SIZE
+    ) -> Iterator[dict]:
+        return self.iter_rows_sql(self._get_read_table_asof_query(table, as_of), batch_size)
+
+    def iter_batches(
+        self, table: str, as_of: Optional[str] = None, batch_size: int = DEFAULT_READ_BATCH_SIZE
+    ) -> Iterator[List[dict]]:
+        return self.iter_batches_sql(self._get_read_table_asof_query(table, as_of), batch_size)
+
+    def iter_rows_sql(self, sql: str, batch_size: int = DEFAULT_READ_BATCH_SIZE) -> Iterator[dict]:
+        for batch in self.iter_batches_sql(sql, batch_size):
+            yield from batch
+
+    def iter_batches_sql(self, sql: str, batch_size: int = DEFAULT_READ_BATCH_SIZE) -> Iterator[List[dict]]:
+        """
+        Streams the result of the query from the server, yielding lists of at most batch_size rows as they arrive, so
+        only a single batch is held in memory and processing can start before the query has finished.
+        :param sql:
+        :param batch_size:
+        :return:
+        """
+        for columns, batch in self._iter_result_batches(sql, batch_size):
+            yield [dict(zip(columns, row)) for row in batch]
+
+    def iter_pandas(
+        self,
+        table: str,
+        as_of: Optional[str] = None,
+        chunk_size: int = DEFAULT_READ_BATCH_SIZE,
+        dtypes: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        return self.iter_pandas_sql(self._get_read_table_asof_query(table, as_of), chunk_size, dtypes)
+
+    def iter_pandas_sql(
+        self, sql: str, chunk_size: int = DEFAULT_READ_BATCH_SIZE, dtypes: Optional[Mapping[str, Any]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Streams the result of the query from the server as DataFrames of at most chunk_size rows. Columns in dtypes are
+        built directly with the given dtype, so they have the same type in every chunk whatever values it happens to
+        hold, for example "Int64" for an integer column with NULLs. Other columns have their type inferred per chunk.
+        :param sql:
+        :param chunk_size:
+        :param dtypes:
+        :return:
+        """
+        dtypes = dtypes or {}
+        for columns, batch in self._iter_result_batches(sql, chunk_size):
+            values = zip(*batch)
+            yield pd.DataFrame(
+                {col: pd.Series(col_values, dtype=dtypes.get(col)) for col, col_values in zip(columns, values)},
+                columns=columns,
+            )
+
+    def read_arrow(
+        self, table: str, as_of: Optional[str] = None, batch_size: int = DEFAULT_READ_BATCH_SIZE
+    ) -> pa.Table:
+        return self.read_arrow_sql(self._get_read_table_asof_query(table, as_of), batch_size, to_list(as_of))
+
+    def read_arrow_sql(
+        self, sql: str, batch_size: int = DEFAULT_READ_BATCH_SIZE, commits: Optional[List[str]] = None
+    ) -> pa.Table:
+        """
+        Reads the result of the query into a pyarrow Table. The result is streamed from the server and each batch of
+        rows is converted to Arrow arrays as it arrives, so at most one batch of rows is held as Python objects. Use
+        arrow_to_pandas to convert the result to a DataFrame without holding two full copies of it. See _read_cached
+        for commits.
+        :param sql:
+        :param batch_size:
+        :param commits:
+        :return:
+        """
+        return self._read_cached("arrow", sql, commits, partial(self._read_arrow_sql, sql, batch_size))
+
+    def _read_arrow_sql(self, sql: str, batch_size: int) -> pa.Table:
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+
+        with self._unbuffered_cursor(sql) as cursor:
+            columns = [description[0] for description in cursor.description]
+            arrow_types = [get_arrow_type(description) for description in cursor.description]
+            record_batches = [
+                rows_to_record_batch(columns, arrow_types, batch) for batch in iter_cursor_batches(cursor, batch_size)
+            ]
+
+        return record_batches_to_table(columns, arrow_types, record_batches)
+
+    def _iter_result_batches(self, sql: str, batch_size: int) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """
+        Executes the query on an unbuffered cursor, yielding the column names and lists of at most batch_size row
+        tuples.
+        :param sql:
+        :param batch_size:
+        :return:
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+
+        with self._unbuffered_cursor(sql) as cursor:
+            columns = [description[0] for description in cursor.description]
+            for batch in iter_cursor_batches(cursor, batch_size):
+                yield columns, batch
+
+    def _get_unbuffered_cursor(self, dbapi_connection: Any) -> Any:
+        if self.server_config.driver == DRIVER_PYMYSQL:
+            from pymysql.cursors import SSCursor  # type: ignore
+
+            return dbapi_connection.cursor(SSCursor)
+        return dbapi_connection.cursor(buffered=False)
+
+    @contextmanager
+    def _unbuffered_cursor(self, sql: str) -> Iterator[Any]:
+        """
+        Executes the query on an unbuffered cursor, the connector equivalent of a server side cursor, so rows are only
+        read from the socket as they are fetched. If the caller stops fetching early the remaining rows are drained so
+        that the connection can be reused.
+        :param sql:
+        :return:
+        """
+        with self._connect_for_read() as conn:
+            cursor = self._get_unbuffered_cursor(conn.connection)
+            try:
+                cursor.execute(sql)
+                yield cursor
+            finally:
+                # PyMySQL drains unbuffered results when the cursor is closed
+                if cursor.description is not None and getattr(conn.connection, "unread_result", False):
+                    while cursor.fetchmany(DEFAULT_READ_BATCH_SIZE):
+                        pass
+                cursor.close()
+
     def log(self) -> Dict:
-        with self.engine.connect() as conn:
-            res = conn.execute(Commit.get_log_table_query())
-            commit_data = [dict(row) for row in res]
-            commits = Commit.parse_dolt_log_table(commit_data)
-            return commits
+        """
+        Returns the commits in the log of HEAD, newest first. The log is kept in the context's CommitGraph, so only
+        commits made since the last call are read.
+        :return:
+        """
+        return self.get_commit_graph().log()
+
+    def get_commit_graph(self) -> CommitGraph:
+        """
+        Returns the index of the commit graph, refreshed to HEAD, for looking up parents, ancestors, merge bases and the
+        commit as of a timestamp without querying the server.
+        :return:
+        """
+        with self._connect() as conn:
+            self.commit_graph.refresh(conn)
+        return self.commit_graph
 
     # TODO
     #  we likely want to support committish semantics here, i.e. anything that can resolve to a commit
@@ -344,22 +1148,236 @@ class DoltSQLContext:
                     AND to_COMMIT = '{to_commit}'
             """
 
+        # the columns of dolt_diff_<table> follow the working set schema, so the result of selecting all of them can
+        # change after ALTER TABLE even between fixed commits, and it is not cached
         result = {table: self.read_pandas_sql(get_query(table)) for table in tables}
 
         return result
 
+    def changeset(
+        self,
+        from_commit: str,
+        to_commit: str,
+        table_or_tables: Union[str, List[str]],
+        columns: Optional[List[str]] = None,
+        where: Optional[str] = None,
+        parallelism: int = 1,
+    ) -> Mapping[str, TableChangeset]:
+        """
+        Reads the inserts, updates and deletes to each table between two commits, which can be anything that resolves to
+        a commit, see get_changeset_query. Only the primary key and the given columns are read, by default every column
+        in the working set schema, and only the changed rows matching the where clause, which is SQL over the columns of
+        the table's diff, for example to_price > 10. With parallelism greater than one tables are read concurrently.
+        :param from_commit:
+        :param to_commit:
+        :param table_or_tables:
+        :param columns:
+        :param where:
+        :param parallelism:
+        :return:
+        """
+        self._validate_read_parallelism(parallelism)
+        read_changeset = partial(self._read_changeset, from_commit, to_commit, columns=columns, where=where)
+        tables = to_list(table_or_tables)
+        if parallelism == 1:
+            return {table: read_changeset(table) for table in tables}
+
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            return dict(zip(tables, executor.map(read_changeset, tables)))
+
+    def iter_changeset(
+        self,
+        from_commit: str,
+        to_commit: str,
+        table: str,
+        diff_type: str,
+        columns: Optional[List[str]] = None,
+        where: Optional[str] = None,
+        chunk_size: int = DEFAULT_READ_BATCH_SIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Streams the changes of one diff_type, "added", "modified" or "removed", to the table between two commits as
+        DataFrames of at most chunk_size rows, in the layout of the corresponding TableChangeset attribute.
+        :param from_commit:
+        :param to_commit:
+        :param table:
+        :param diff_type:
+        :param columns:
+        :param where:
+        :param chunk_size:
+        :return:
+        """
+        columns, primary_key = self._get_changeset_columns(table, columns)
+        query = get_changeset_query(table, from_commit, to_commit, diff_type, columns, primary_key, where)
+        return self.iter_pandas_sql(query, chunk_size)
+
+    def _read_changeset(
+        self, from_commit: str, to_commit: str, table: str, columns: Optional[List[str]], where: Optional[str]
+    ) -> TableChangeset:
+        columns, primary_key = self._get_changeset_columns(table, columns)
+        inserts, updates, deletes = [
+            self.read_pandas_sql(
+                get_changeset_query(table, from_commit, to_commit, diff_type, columns, primary_key, where),
+                commits=[from_commit, to_commit],
+            )
+            for diff_type in (DIFF_TYPE_ADDED, DIFF_TYPE_MODIFIED, DIFF_TYPE_REMOVED)
+        ]
+        return TableChangeset(table, inserts, updates, deletes)
+
+    def _get_changeset_columns(self, table: str, columns: Optional[List[str]]) -> Tuple[List[str], List[str]]:
+        sa_table = self.get_table(table)
+        if sa_table is None:
+            if columns is None:
+                raise ValueError(f"Table {table} is not in the working set, the columns to read must be given")
+            return columns, []
+
+        primary_key = [col.name for col in sa_table.primary_key.columns]
+        return columns if columns is not None else [col.name for col in sa_table.columns], primary_key
+
     def tables(self) -> List[str]:
-        with self.engine.connect() as conn:
+        with self._connect() as conn:
             result = conn.execute("select table_name from information_schema.tables where table_schema = DATABASE();")
             return [row["TABLE_NAME"] for row in result]
 
 
+class DoltSQLWriteSession(DoltSQLContext):
+    """
+    A view of a DoltSQLContext bound to a single connection with an open transaction, created by
+    DoltSQLContext.write_session. Tables created by writes are created outside the transaction, since DDL commits
+    implicitly, and parallel writes are not supported as a connection cannot be shared between threads.
+
+    The tables written are committed only when the session exits, so writes default to commit=False, and passing
+    commit=True to a write, or calling commit_tables, raises a ValueError.
+    """
+
+    def __init__(self, context: DoltSQLContext, connection: Connection):
+        self.database = context.database
+        self.server_config = context.server_config
+        self.engine = context.engine
+        self.metadata_cache = context.metadata_cache
+        self.batch_sizer = context.batch_sizer
+        self.result_cache = context.result_cache
+        self.commit_graph = context.commit_graph
+        self.pool_monitor = context.pool_monitor
+        self.connection = connection
+        self.tables_written: List[str] = []
+        self.commit_hash: Optional[str] = None
+
+    @contextmanager
+    def _connect(self) -> Iterator[Connection]:
+        yield self.connection
+
+    def write_session(self, commit_message: Optional[str] = None, allow_empty: bool = False):
+        raise ValueError("Write sessions cannot be nested")
+
+    def commit_tables(
+        self,
+        commit_message: Optional[str] = None,
+        table_or_tables: Optional[Union[str, List[str]]] = None,
+        allow_emtpy: bool = False,
+    ) -> str:
+        raise ValueError("Tables are committed when the write session exits, pass a commit_message to write_session")
+
+    def write_columns(
+        self,
+        table: str,
+        columns: Union[Mapping[str, Iterable[Any]], pa.Table],
+        on_duplicate_key_update: bool = True,
+        create_if_not_exists: bool = False,
+        primary_key: Optional[List[str]] = None,
+        commit: bool = False,
+        commit_message: Optional[str] = None,
+        commit_date: Optional[datetime.datetime] = None,
+        allow_empty: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        write_mode: str = WRITE_MODE_INSERT,
+        parallelism: int = 1,
+    ):
+        if commit:
+            self.commit_tables(commit_message, table, allow_empty)
+        return super().write_columns(
+            table,
+            columns,
+            on_duplicate_key_update,
+            create_if_not_exists,
+            primary_key,
+            False,
+            commit_message,
+            commit_date,
+            allow_empty,
+            batch_size,
+            write_mode=write_mode,
+            parallelism=parallelism,
+        )
+
+    def write_file(
+        self,
+        table: str,
+        file_path: str,
+        on_duplicate_key_update: bool = True,
+        create_if_not_exists: bool = False,
+        primary_key: Optional[List[str]] = None,
+        commit: bool = False,
+        commit_message: Optional[str] = None,
+        commit_date: Optional[datetime.datetime] = None,
+        allow_empty: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        write_mode: str = WRITE_MODE_INSERT,
+        parallelism: int = 1,
+    ):
+        if commit:
+            self.commit_tables(commit_message, table, allow_empty)
+        return super().write_file(
+            table,
+            file_path,
+            on_duplicate_key_update,
+            create_if_not_exists,
+            primary_key,
+            False,
+            commit_message,
+            commit_date,
+            allow_empty,
+            batch_size,
+            write_mode=write_mode,
+            parallelism=parallelism,
+        )
+
+    def _validate_read_parallelism(self, parallelism: int):
+        if parallelism != 1:
+            raise ValueError("Parallel reads are not supported in a write session, which holds a single connection")
+
+    def _validate_write_args(self, write_mode: str, parallelism: int):
+        if parallelism > 1:
+            raise ValueError("Parallel writes are not supported in a write session")
+        super()._validate_write_args(write_mode, parallelism)
+
+    def _write_sized(self, batch: List[Any], write_batch: Callable[[List[Any]], None]):
+        # a batch rejected as too large can cost the session its connection, and with it the transaction
+        if self.batch_sizer is not None:
+            write_batch_adaptive(self.batch_sizer, batch, write_batch, retry=False)
+        else:
+            write_batch(batch)
+
+    def _get_write_table(
+        self,
+        table_name: str,
+        create_if_not_exists: bool,
+        primary_key: Optional[List[str]],
+        get_sample: Callable[[], List[dict]],
+    ) -> sa.Table:
+        table = super()._get_write_table(table_name, create_if_not_exists, primary_key, get_sample)
+        if table_name not in self.tables_written:
+            self.tables_written.append(table_name)
+        return table
+
+
 class DoltSQLEngineContext(DoltSQLContext):
     def __init__(self, dolt: Dolt, server_config: ServerConfig):
         self.dolt = dolt
         self.database = dolt.repo_name
         self.server_config = server_config
         self.engine = self._get_engine()
+        self.__post_init__()
         self.verify_connection()
 
 
@@ -369,10 +1387,31 @@ class DoltSQLServerContext(DoltSQLContext):
         self.database = dolt.repo_name
         self.server_config = server_config
         self.engine = self._get_engine()
-        self.server = None
+        self.__post_init__()
+        self.server: Optional[Popen] = None
         self.checkout_branch = None
+        self.startup_seconds: Optional[float] = None
+        self.daemon: Optional[ServerDaemon] = None
+        self.daemon_process: Optional[psutil.Process] = None
+        self.supervisor: Optional[ServerSupervisor] = None
 
     def __enter__(self):
+        if self.server_config.daemon:
+            return self._attach_daemon()
+
+        self._prepare_repo()
+        start = time.perf_counter()
+        self.start_server()
+        try:
+            self.wait_until_ready()
+        except BaseException:
+            self.__exit__()
+            raise
+        self.startup_seconds = time.perf_counter() - start
+        logger.info(f"Dolt SQL Server started in {self.startup_seconds * 1000:.0f}ms")
+        return self
+
+    def _prepare_repo(self):
         if not self.dolt.status().is_clean:
             # TODO better error messages
             raise ValueError("DoltSQLServerManager does not support ")
@@ -382,14 +1421,66 @@ class DoltSQLServerContext(DoltSQLContext):
                 self.dolt.checkout(self.server_config.branch)
                 self.checkout_branch = current_branch.name
 
-        self.start_server()
-        self.verify_connection()
+    def _attach_daemon(self):
+        """
+        Attaches to the server shared by every process using the repository, starting it if none is running. A server
+        started this way is left running when the context exits, and the branch it checked out is not restored, since
+        other processes may still be using it.
+        :return:
+        """
+
+        def start_server() -> int:
+            self._prepare_repo()
+            self.checkout_branch = None
+            self.start_server()
+            assert self.server is not None
+            return self.server.pid
+
+        start = time.perf_counter()
+        daemon = ServerDaemon(self.dolt.repo_dir, self.server_config.daemon_idle_timeout)
+        daemon.attach(self.server_config.host, self.server_config.port, start_server)
+        self.daemon = daemon
+        try:
+            self.wait_until_ready()
+        except BaseException:
+            self.__exit__()
+            raise
+        self.startup_seconds = time.perf_counter() - start
+        logger.info(f"Dolt SQL Server daemon ready in {self.startup_seconds * 1000:.0f}ms")
         return self
 
+    def wait_until_ready(self):
+        """
+        Waits for the server to accept connections, probing first its TCP port and then a SQL connection with
+        millisecond backoff rather than fixed sleeps. Raises ServerStartupError if the server process exits, or is not
+        ready within ServerConfig.startup_timeout seconds.
+        :return:
+        """
+        timeout = self.server_config.startup_timeout
+        deadline = time.perf_counter() + timeout
+        poll_until_ready(partial(is_port_open, self.server_config.host, self.server_config.port), self.server, timeout)
+        poll_until_ready(self._can_connect, self.server, max(0.0, deadline - time.perf_counter()))
+
+    def _can_connect(self) -> bool:
+        try:
+            with self.engine.connect():
+                return True
+        except (sa.exc.OperationalError, sa.exc.DatabaseError, sa.exc.InterfaceError) as e:
+            logger.debug(f"Dolt SQL Server not ready: {e}")
+            return False
+
     def __exit__(self, *args):
+        if self.daemon is not None:
+            self.daemon.detach()
+            self.daemon = None
+            self.server = None
+            self.engine.dispose()
+            return
+
         self.stop_server()
         if self.checkout_branch:
             self.dolt.checkout(self.checkout_branch)
+            self.checkout_branch = None
 
     def start_server(self):
         """
@@ -409,14 +1500,29 @@ class DoltSQLServerContext(DoltSQLContext):
             else:
                 out = open(log_file, "w")
 
-            proc = Popen(
+            start = partial(
+                Popen,
                 args=["dolt"] + server_args,
                 cwd=self.dolt.repo_dir,
                 stdout=out,
                 stderr=STDOUT,
+                # a daemon is not interrupted along with the terminal session of the process that started it
+                start_new_session=self.server_config.daemon,
             )
 
-            self.server = proc
+            # a daemon's lifetime is managed by its watchdog, see ServerDaemon
+            if self.server_config.daemon:
+                self.server = start()
+                return
+
+            self.supervisor = ServerSupervisor(
+                start,
+                on_restart=self._on_server_restart,
+                metrics_interval=self.server_config.metrics_interval,
+                max_restarts=self.server_config.max_restarts,
+                drain_timeout=self.server_config.drain_timeout,
+            )
+            self.server = self.supervisor.start()
 
         args = ["sql-server"]
 
@@ -455,5 +1561,41 @@ class DoltSQLServerContext(DoltSQLContext):
             logger.warning("Server is not running")
             return
 
-        self.server.kill()
+        if self.supervisor is not None:
+            self.supervisor.stop()
+            self.supervisor = None
+        else:
+            terminate_process(self.server, self.server_config.drain_timeout)
         self.server = None
+
+    def _on_server_restart(self, proc: Popen):
+        # called by the supervisor holding its lock, so stop_server cannot stop the supervisor meanwhile, and a restart
+        # racing with stop_server is skipped
+        supervisor = self.supervisor
+        if supervisor is None or supervisor.stopping.is_set():
+            return
+        self.server = proc
+        # pooled connections to the crashed server are dead
+        self.engine.dispose()
+        self.wait_until_ready()
+
+    def server_metrics(self) -> Optional[ServerMetrics]:
+        """
+        Returns the latest sample of the server process's CPU usage, memory, open files and client connections, see
+        ServerSupervisor. For a server shared as a daemon the process is sampled when this is called.
+        :return:
+        """
+        if self.supervisor is not None:
+            return self.supervisor.metrics()
+        if self.daemon is not None and self.daemon.pid is not None:
+            if self.daemon_process is None or self.daemon_process.pid != self.daemon.pid:
+                self.daemon_process = psutil.Process(self.daemon.pid)
+            return sample_process_metrics(self.daemon_process)
+        return None
+
+    def server_metrics_history(self) -> List[ServerMetrics]:
+        """
+        Returns the samples of the server process's resource usage retained by its supervisor, oldest first.
+        :return:
+        """
+        return self.supervisor.metrics_history() if self.supervisor is not None else []
@@ -0,0 +1,210 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from subprocess import Popen, TimeoutExpired
+from typing import Callable, Deque, List, Optional
+
+import psutil  # type: ignore
+
+from ..shared.system_helpers import register_process, unregister_process
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_INTERVAL = 1.0
+DEFAULT_METRICS_HISTORY = 600
+DEFAULT_DRAIN_TIMEOUT = 10.0
+DEFAULT_MAX_RESTARTS = 5
+INITIAL_RESTART_DELAY, MAX_RESTART_DELAY = 0.1, 30.0
+
+
+@dataclass
+class ServerMetrics:
+    pid: int
+    timestamp: float
+    uptime_seconds: float
+    cpu_percent: float
+    rss_bytes: int
+    open_files: int
+    connections: int
+    restarts: int
+
+
+def sample_process_metrics(proc: psutil.Process, restarts: int = 0) -> ServerMetrics:
+    """
+    Samples the resource usage of a server process. CPU usage is measured since the previous sample of the same
+    psutil.Process, so the first sample of a process reports 0.0. Connections are the established TCP connections, that
+    is the clients connected to the server.
+    :param proc:
+    :param restarts:
+    :return:
+    """
+    with proc.oneshot():
+        # psutil 6 renamed connections to net_connections
+        get_connections = getattr(proc, "net_connections", None) or proc.connections
+        return ServerMetrics(
+            pid=proc.pid,
+            timestamp=time.time(),
+            uptime_seconds=time.time() - proc.create_time(),
+            cpu_percent=proc.cpu_percent(None),
+            rss_bytes=proc.memory_info().rss,
+            open_files=len(proc.open_files()),
+            connections=len([conn for conn in get_connections("tcp") if conn.status == psutil.CONN_ESTABLISHED]),
+            restarts=restarts,
+        )
+
+
+def terminate_process(proc: Popen, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT):
+    """
+    Sends the process SIGTERM, so a server can finish the queries in flight and close its connections, and kills it if
+    it has not exited within drain_timeout seconds.
+    :param proc:
+    :param drain_timeout:
+    :return:
+    """
+    if proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(drain_timeout)
+    except TimeoutExpired:
+        logger.warning(f"Process {proc.pid} did not exit within {drain_timeout}s of SIGTERM, killing it")
+        proc.kill()
+        proc.wait()
+
+
+class ServerSupervisor:
+    """
+    Runs a server process started by start and watches it from a background thread. Every metrics_interval seconds the
+    thread samples the process's resource usage, keeping the last history_size samples, so that growth in memory or
+    connections under load can be spotted. If the process exits unexpectedly it is started again after a delay that
+    doubles with each consecutive crash, from INITIAL_RESTART_DELAY up to MAX_RESTART_DELAY, and on_restart is called
+    with the new process. A process that stays up for MAX_RESTART_DELAY resets the delay, and after max_restarts
+    consecutive crashes the supervisor gives up.
+
+    on_restart is called from the supervisor's thread while holding its lock, and not once stop has been called, so
+    stop waits for a restart in progress to finish and then stops the restarted process.
+
+    The process is stopped by stop, with terminate_process, or at interpreter exit if it is still running.
+    """
+
+    def __init__(
+        self,
+        start: Callable[[], Popen],
+        on_restart: Optional[Callable[[Popen], None]] = None,
+        metrics_interval: float = DEFAULT_METRICS_INTERVAL,
+        history_size: int = DEFAULT_METRICS_HISTORY,
+        max_restarts: int = DEFAULT_MAX_RESTARTS,
+        drain_timeout: float = DEFAULT_DRAIN_TIMEOUT,
+    ):
+        self.start_process = start
+        self.on_restart = on_restart
+        self.metrics_interval = metrics_interval
+        self.max_restarts = max_restarts
+        self.drain_timeout = drain_timeout
+        self.proc: Optional[Popen] = None
+        self.restarts = 0
+        self.history: Deque[ServerMetrics] = deque(maxlen=history_size)
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self._process: Optional[psutil.Process] = None
+
+    def start(self) -> Popen:
+        with self.lock:
+            self._start()
+        self.thread = threading.Thread(target=self._run, name="dolt-sql-server-supervisor", daemon=True)
+        self.thread.start()
+        assert self.proc is not None
+        return self.proc
+
+    def _start(self):
+        self.proc = self.start_process()
+        self._process = psutil.Process(self.proc.pid)
+        register_process(self.proc.pid, self.stop)
+
+    def stop(self):
+        """
+        Stops supervising the process and stops it gracefully, see terminate_process.
+        :return:
+        """
+        self.stopping.set()
+        with self.lock:
+            proc = self.proc
+        if proc is not None:
+            terminate_process(proc, self.drain_timeout)
+            unregister_process(proc.pid)
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def metrics(self) -> Optional[ServerMetrics]:
+        """
+        Returns the latest sample of the running process's resource usage, sampling it if there is none yet. Returns
+        None while the process is not running, for example after a crash until it is restarted, rather than the last
+        sample of the exited process, which remains in metrics_history.
+        :return:
+        """
+        with self.lock:
+            if self.proc is None or self.proc.poll() is not None:
+                return None
+            if not self.history or self.history[-1].pid != self.proc.pid:
+                self._sample()
+            latest = self.history[-1] if self.history else None
+            return latest if latest is not None and latest.pid == self.proc.pid else None
+
+    def metrics_history(self) -> List[ServerMetrics]:
+        """
+        Returns the retained samples, oldest first.
+        :return:
+        """
+        with self.lock:
+            return list(self.history)
+
+    def _sample(self):
+        if self._process is None:
+            return
+        try:
+            self.history.append(sample_process_metrics(self._process, self.restarts))
+        except psutil.Error as e:
+            logger.debug(f"Failed to sample metrics of process {self._process.pid}: {e}")
+
+    def _run(self):
+        crashes = 0
+        while not self.stopping.wait(self.metrics_interval):
+            with self.lock:
+                if self.stopping.is_set():
+                    return
+                assert self.proc is not None
+                if self.proc.poll() is None:
+                    self._sample()
+                    if crashes and self.history and self.history[-1].uptime_seconds >= MAX_RESTART_DELAY:
+                        crashes = 0
+                    continue
+                pid, returncode = self.proc.pid, self.proc.returncode
+                unregister_process(pid)
+
+            if crashes >= self.max_restarts:
+                logger.error(f"Dolt SQL Server with pid {pid} exited with code {returncode}, not restarting it")
+                return
+
+            delay = min(INITIAL_RESTART_DELAY * 2 ** crashes, MAX_RESTART_DELAY)
+            logger.warning(f"Dolt SQL Server with pid {pid} exited with code {returncode}, restarting in {delay}s")
+            if self.stopping.wait(delay):
+                return
+            with self.lock:
+                if self.stopping.is_set():
+                    return
+                try:
+                    self._start()
+                except OSError as e:
+                    logger.error(f"Failed to restart Dolt SQL Server: {e}")
+                    return
+                self.restarts += 1
+                crashes += 1
+                proc = self.proc
+                if self.on_restart is not None and not self.stopping.is_set():
+                    try:
+                        self.on_restart(proc)
+                    except Exception as e:
+                        logger.warning(f"Dolt SQL Server with pid {proc.pid} restarted, but on_restart failed: {e}")
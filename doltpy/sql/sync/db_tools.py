@@ -1,10 +1,13 @@
 import logging
-from typing import Callable, Iterable, List, Mapping, Tuple
+from functools import partial
+from typing import Callable, Iterable, List, Mapping, Optional, Tuple
 
 from retry import retry
 from sqlalchemy import MetaData, Table  # type: ignore
 from sqlalchemy.engine import Engine  # type: ignore
 
+from doltpy.sql.batching import AdaptiveBatchSizer, write_batch_adaptive
+
 logger = logging.getLogger(__name__)
 
 # Types that reflect the different nature of the syncs
@@ -85,6 +88,7 @@ def get_target_writer_helper(
     get_upsert_statement,
     update_on_duplicate: bool,
     clean_types: Callable[[Iterable[dict]], List[dict]] = None,
+    batch_sizer: Optional[AdaptiveBatchSizer] = None,
 ) -> DoltAsSourceWriter:
     """
     Given a database connection returns a function that when passed a mapping from table names to TableUpdate will
@@ -93,9 +97,18 @@ def get_target_writer_helper(
     :param get_upsert_statement:
     :param update_on_duplicate: indicates whether to update values when encountering duplicate PK, default True
     :param clean_types: an optional function to clean up the types being written
+    :param batch_sizer: optionally split the data into batches by estimated size, rather than one statement per table
     :return:
     """
 
+    def write_batch(table: Table, batch: List[dict]):
+        with engine.connect() as conn:
+            if update_on_duplicate:
+                statement = get_upsert_statement(table, batch)
+            else:
+                statement = table.insert().values(batch)
+            conn.execute(statement)
+
     def inner(table_data_map: DoltAsSourceUpdate):
         metadata = MetaData(bind=engine)
         metadata.reflect()
@@ -113,13 +126,12 @@ def get_target_writer_helper(
                 drop_primary_keys(engine, table, pks_to_drop)
 
             # Now we can perform our inserts
-            if data:
-                with engine.connect() as conn:
-                    if update_on_duplicate:
-                        statement = get_upsert_statement(table, clean_data)
-                    else:
-                        statement = table.insert().values(clean_data)
-                    conn.execute(statement)
+            if clean_data:
+                if batch_sizer:
+                    for batch in batch_sizer.batches(clean_data):
+                        write_batch_adaptive(batch_sizer, batch, partial(write_batch, table))
+                else:
+                    write_batch(table, clean_data)
 
     return inner
 
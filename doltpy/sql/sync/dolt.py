@@ -1,7 +1,7 @@
 import logging
 from typing import Callable, List, Tuple, Optional
 
-from sqlalchemy import MetaData, Table  # type: ignore
+from sqlalchemy import Table  # type: ignore
 from sqlalchemy.engine import Engine  # type: ignore
 
 from doltpy.sql import Commit
@@ -31,14 +31,13 @@ def get_target_writer(dsc: DoltSQLContext, commit: bool = True, message: Optiona
     """
 
     def inner(table_data_map: DoltAsTargetUpdate):
-        metadata = MetaData(bind=dsc.engine)
-        metadata.reflect()
-
         for table_name, table_update in table_data_map.items():
-            table = metadata.tables[table_name]
-            data = table_update
-            drop_missing_pks(dsc.engine, table, list(data))
-            dsc.write_rows(table.name, list(data), on_duplicate_key_update=True)
+            table = dsc.get_table(table_name)
+            if table is None:
+                raise ValueError(f"Table {table_name} does not exist in the target Dolt database")
+            data = list(table_update)
+            drop_missing_pks(dsc.engine, table, data)
+            dsc.write_rows(table.name, data, on_duplicate_key_update=True)
 
         if commit:
             tables = [table_name for table_name, _ in table_data_map.items()]
@@ -114,9 +113,7 @@ def get_table_reader_diffs(
     def inner(table_name: str, dsc: DoltSQLContext) -> DoltTableUpdate:
 
         commit = get_from_commit_to_commit(dsc, commit_ref)
-        metadata = MetaData(bind=dsc.engine)
-        metadata.reflect()
-        table = metadata.tables[table_name]
+        table = dsc.get_table(table_name)
         pks_to_drop = get_dropped_pks(dsc.engine, table, commit)
         result = _read_from_dolt_diff(dsc.engine, table, commit)
         return pks_to_drop, result
@@ -175,12 +172,13 @@ def get_table_reader(
     """
 
     def inner(table_name: str, dsc: DoltSQLContext) -> DoltTableUpdate:
-        # TODO do this in SQL
-        query_commit = commit_ref or list(dsc.log().keys())[0]
+        query_commit = commit_ref or dsc.get_commit_graph().head
+        if query_commit is None:
+            raise ValueError(f"Cannot read table {table_name}, no commit was given and the database has no HEAD commit")
         table = get_table_metadata(dsc.engine, table_name)
         commit = get_from_commit_to_commit(dsc, query_commit)
         pks_to_drop = get_dropped_pks(dsc.engine, table, commit)
-        result = _read_from_dolt_history(dsc.engine, table, query_commit)
+        result = _read_from_dolt_history(dsc, table, query_commit)
         return pks_to_drop, result
 
     return inner
@@ -200,7 +198,7 @@ def _read_from_dolt_diff(engine: Engine, table: Table, dolt_commit: Commit) -> L
     return _query_helper(engine, query)
 
 
-def _read_from_dolt_history(engine: Engine, table: Table, commit_ref: str) -> List[dict]:
+def _read_from_dolt_history(dsc: DoltSQLContext, table: Table, commit_ref: str) -> List[dict]:
     query = f"""
         SELECT
             {','.join(f"`{col.name}` AS {col.name}" for col in table.columns)}
@@ -210,7 +208,7 @@ def _read_from_dolt_history(engine: Engine, table: Table, commit_ref: str) -> Li
             commit_hash = '{commit_ref}'
     """
 
-    return _query_helper(engine, query)
+    return dsc.read_rows_sql(query, commits=[commit_ref])
 
 
 def _query_helper(engine: Engine, query: str):
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Optional
 
 from sqlalchemy import Table  # type: ignore
 from sqlalchemy.dialects import mysql  # type: ignore
@@ -7,6 +7,7 @@ from sqlalchemy.dialects.mysql import insert  # type: ignore
 from sqlalchemy.engine import Engine  # type: ignore
 
 from doltpy.sql.helpers import clean_types
+from doltpy.sql.batching import AdaptiveBatchSizer
 from doltpy.sql.sync.db_tools import DoltAsSourceWriter, get_target_writer_helper
 
 logger = logging.getLogger(__name__)
@@ -14,15 +15,18 @@ logger = logging.getLogger(__name__)
 MYSQL_TO_DOLT_TYPE_MAPPINGS = {mysql.JSON: mysql.LONGTEXT}
 
 
-def get_target_writer(engine: Engine, update_on_duplicate: bool = True) -> DoltAsSourceWriter:
+def get_target_writer(
+    engine: Engine, update_on_duplicate: bool = True, batch_sizer: Optional[AdaptiveBatchSizer] = None
+) -> DoltAsSourceWriter:
     """
     Given a database connection returns a function that when passed a mapping from table names to TableUpdate will
     apply the table update. A table update consists of primary key values to drop, and data to insert/update.
     :param engine: a database connection
     :param update_on_duplicate: indicates whether to update values when encountering duplicate PK, default True
+    :param batch_sizer: optionally write the data in batches sized by their estimated size in bytes
     :return:
     """
-    return get_target_writer_helper(engine, upsert_helper, update_on_duplicate, clean_types)
+    return get_target_writer_helper(engine, upsert_helper, update_on_duplicate, clean_types, batch_sizer)
 
 
 def upsert_helper(table: Table, data: List[dict]):
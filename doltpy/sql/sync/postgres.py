@@ -1,11 +1,12 @@
 import logging
-from typing import List
+from typing import List, Optional
 
 from sqlalchemy import Table  # type: ignore
 from sqlalchemy.dialects import mysql, postgresql  # type: ignore
 from sqlalchemy.dialects.postgresql import insert  # type: ignore
 from sqlalchemy.engine import Engine  # type: ignore
 
+from doltpy.sql.batching import AdaptiveBatchSizer
 from doltpy.sql.sync.db_tools import DoltAsSourceWriter, get_target_writer_helper
 
 logger = logging.getLogger(__name__)
@@ -23,16 +24,19 @@ POSTGRES_TO_DOLT_TYPE_MAPPINGS = {
 }
 
 
-def get_target_writer(engine: Engine, update_on_duplicate: bool = True) -> DoltAsSourceWriter:
+def get_target_writer(
+    engine: Engine, update_on_duplicate: bool = True, batch_sizer: Optional[AdaptiveBatchSizer] = None
+) -> DoltAsSourceWriter:
     """
     Given a psycopg2 connection returns a function that takes a map of tables names (optionally schema prefixed) to
     list of tuples and writes the list of tuples to the table in question. Each tuple must have the data in the order of
     the target tables columns sorted lexicographically.
     :param engine: database connection.
     :param update_on_duplicate: perform upserts instead of failing on duplicate primary keys
+    :param batch_sizer: optionally write the data in batches sized by their estimated size in bytes
     :return:
     """
-    return get_target_writer_helper(engine, upsert_helper, update_on_duplicate)
+    return get_target_writer_helper(engine, upsert_helper, update_on_duplicate, batch_sizer=batch_sizer)
 
 
 def upsert_helper(table: Table, data: List[dict]):
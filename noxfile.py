@@ -19,5 +19,5 @@ def tests(session):
         # args = session.posargs or ["--cov=term"]
         args = ["-m", '"not sql_sync"']
         # session.run("poetry", "add", f"numpy@{numpy}", f"pillow@{pillow}", external=True)
-        session.run("poetry", "install", external=True)
+        session.run("poetry", "install", "-E", "async", external=True)
         session.run("pytest", *args)
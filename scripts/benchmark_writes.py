@@ -0,0 +1,110 @@
+"""
+Compares the DoltSQLContext write modes. By default a Dolt SQL Server is started on a scratch repo and each write mode
+loads the same rows into its own table. With --compile-only no server is needed, and only the client side cost of
+preparing a batch is measured, that is building a multi-row INSERT with its flattened parameters versus building the
+parameter tuples for the cached executemany statement.
+
+    poetry run python scripts/benchmark_writes.py --rows 200000 --batch-size 100000
+"""
+import argparse
+import datetime
+import itertools
+import tempfile
+import time
+from typing import Callable, List
+
+from doltpy.cli import Dolt
+from doltpy.shared import batch_iterable
+from doltpy.sql import DoltSQLServerContext, ServerConfig
+from doltpy.sql.helpers import clean_columns, get_executemany_upsert_statement, get_insert_statement
+from doltpy.sql.sql import WRITE_MODES, WRITE_MODE_LOAD_DATA
+
+CREATE_TABLE = """
+    CREATE TABLE `{}` (
+        `id` INT NOT NULL,
+        `name` VARCHAR(64),
+        `value` DOUBLE,
+        `updated_at` DATETIME,
+        PRIMARY KEY (`id`)
+    )
+"""
+
+
+def get_rows(row_count: int) -> List[dict]:
+    start = datetime.datetime(2020, 1, 1)
+    return [
+        {"id": i, "name": f"name_{i}", "value": i * 0.5, "updated_at": start + datetime.timedelta(seconds=i)}
+        for i in range(row_count)
+    ]
+
+
+def timed(label: str, func: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32}{elapsed:>10.3f}s")
+    return elapsed
+
+
+def benchmark_compile(rows: List[dict], batch_size: int):
+    columns = tuple(rows[0].keys())
+    primary_key = ("id",)
+
+    def get_params(batch: List[dict]) -> List[tuple]:
+        # the rows are cleaned column by column, as write_rows does before choosing a write mode
+        return list(zip(*clean_columns([[row[col] for row in batch] for col in columns])))
+
+    def build_inserts():
+        for batch in batch_iterable(rows, batch_size):
+            params = get_params(batch)
+            get_insert_statement("benchmark", columns, primary_key, True, len(params))
+            tuple(itertools.chain.from_iterable(params))
+
+    def build_executemany():
+        for batch in batch_iterable(rows, batch_size):
+            get_params(batch)
+            get_executemany_upsert_statement("benchmark", columns, primary_key, True)
+
+    timed("build multi-row insert", build_inserts)
+    timed("build executemany params", build_executemany)
+
+
+def benchmark_server(rows: List[dict], batch_size: int, port: int):
+    with tempfile.TemporaryDirectory() as repo_dir:
+        dolt = Dolt.init(repo_dir)
+        for mode in WRITE_MODES:
+            dolt.sql(query=CREATE_TABLE.format(f"benchmark_{mode}"))
+        dolt.sql(query="CALL DOLT_COMMIT('-Am', 'Create benchmark tables')")
+
+        server_config = ServerConfig(user="root", port=port, allow_local_infile=True)
+        with DoltSQLServerContext(dolt, server_config) as dssc:
+            for mode in WRITE_MODES:
+
+                def write():
+                    dssc.write_rows(f"benchmark_{mode}", rows, batch_size=batch_size, write_mode=mode)
+
+                try:
+                    timed(f"write_rows({mode})", write)
+                except Exception as e:
+                    if mode != WRITE_MODE_LOAD_DATA:
+                        raise
+                    print(f"write_rows({mode}) failed, server may not support LOCAL INFILE: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--compile-only", action="store_true")
+    args = parser.parse_args()
+
+    rows = get_rows(args.rows)
+    print(f"Writing {args.rows} rows in batches of {args.batch_size}")
+    benchmark_compile(rows, args.batch_size)
+    if not args.compile_only:
+        benchmark_server(rows, args.batch_size, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@ from typing import List
 import pytest
 from doltpy.cli.write import write_rows, CREATE, UPDATE
 from .helpers import compare_rows
-from doltpy.cli.read import read_pandas
+from doltpy.cli.read import read_arrow, read_pandas
+from doltpy.shared import arrow_to_pandas
 
 
 TEST_TABLE = 'characters'
@@ -54,3 +55,24 @@ def test_read_pandas_pq(with_initial_test_data):
     second_write = read_pandas(dolt, TEST_TABLE, second_commit, fmt="pq")
     compare_rows(TEST_DATA_COMBINED, second_write.to_dict('records'), "id")
 
+
+
+def test_read_arrow(with_initial_test_data):
+    dolt, first_commit = with_initial_test_data
+    second_commit = update_test_data(dolt)
+    first_write = read_arrow(dolt, TEST_TABLE, first_commit)
+    assert sorted(first_write.column('id').to_pylist()) == [row['id'] for row in TEST_DATA_INITIAL]
+    assert arrow_to_pandas(first_write)['name'].tolist() == [row['name'] for row in TEST_DATA_INITIAL]
+    second_write = read_arrow(dolt, TEST_TABLE, second_commit, fmt="parquet")
+    assert sorted(second_write.column('id').to_pylist()) == [row['id'] for row in TEST_DATA_COMBINED]
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_read_pandas_pushdown(with_initial_test_data, fmt):
+    dolt, first_commit = with_initial_test_data
+    update_test_data(dolt)
+    df = read_pandas(dolt, TEST_TABLE, first_commit, fmt=fmt, columns=['id', 'name'], where='id > 1', limit=1)
+    assert list(df.columns) == ['id', 'name']
+    assert len(df) == 1 and df['id'].iloc[0] > 1
+    # the scratch table used for filtered exports is not left behind
+    assert [table.name for table in dolt.ls()] == [TEST_TABLE]
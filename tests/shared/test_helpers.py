@@ -0,0 +1,11 @@
+import pytest
+
+from doltpy.shared import batch_iterable
+
+
+def test_batch_iterable():
+    assert list(batch_iterable(iter(range(7)), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batch_iterable([], 3)) == []
+    with pytest.raises(ValueError):
+        list(batch_iterable([1], 0))
+
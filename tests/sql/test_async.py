@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from doltpy.sql import AsyncDoltSQLContext, DoltSQLServerContext
+from doltpy.shared import columns_to_rows
+from .helpers import TEST_SERVER_CONFIG, TEST_TABLE, TEST_DATA_INITIAL, TEST_DATA_UPDATE, TEST_DATA_FINAL, compare_rows
+
+pytest.importorskip('aiomysql')
+
+
+def test_async_read_write(with_test_table):
+    dolt = with_test_table
+
+    async def run(database: str):
+        async with AsyncDoltSQLContext(database, TEST_SERVER_CONFIG) as context:
+            first_commit = await context.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True, commit_message='first')
+            await context.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True, commit_message='second')
+            first_write, second_write, columns = await asyncio.gather(
+                context.read_rows(TEST_TABLE, first_commit),
+                context.read_pandas(TEST_TABLE),
+                context.read_columns(TEST_TABLE),
+            )
+            compare_rows(TEST_DATA_INITIAL, first_write, 'name')
+            compare_rows(TEST_DATA_FINAL, second_write.to_dict('records'), 'name')
+            compare_rows(TEST_DATA_FINAL, columns_to_rows(columns), 'name')
+
+            batches = [batch async for batch in context.iter_batches(TEST_TABLE, batch_size=3)]
+            assert [len(batch) for batch in batches] == [3, 1]
+
+            commits = await context.log()
+            assert first_commit in commits
+            diff = await context.diff(first_commit, list(commits.keys())[0], TEST_TABLE)
+            assert len(diff[TEST_TABLE]) == 2
+
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        asyncio.run(run(dssc.database))
+
+
+def test_async_write_rows_mismatched_keys(with_test_table):
+    dolt = with_test_table
+    rows = [TEST_DATA_INITIAL[0], {'id': 5, 'name': 'Kitty'}]
+
+    async def run(database: str):
+        async with AsyncDoltSQLContext(database, TEST_SERVER_CONFIG) as context:
+            with pytest.raises(ValueError):
+                await context.write_rows(TEST_TABLE, rows)
+
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        asyncio.run(run(dssc.database))
@@ -0,0 +1,70 @@
+from unittest import mock
+
+import pytest
+import sqlalchemy as sa
+
+from doltpy.sql.batching import MIN_BATCH_BYTES, AdaptiveBatchSizer, estimate_row_bytes, write_batch_adaptive
+from doltpy.sql.sql import DoltSQLWriteSession
+
+
+class PacketTooLarge(Exception):
+    errno = 1153
+
+
+def test_batches_by_bytes():
+    rows = [{'id': i, 'name': 'x' * 100} for i in range(1000)]
+    row_bytes = estimate_row_bytes(rows[0])
+    sizer = AdaptiveBatchSizer(row_bytes * 10)
+    batches = list(sizer.batches(rows))
+    assert [len(batch) for batch in batches] == [10] * 100
+
+
+def test_record_latency():
+    sizer = AdaptiveBatchSizer(MIN_BATCH_BYTES * 8, target_seconds=1.0)
+    sizer.record(4.0)
+    assert sizer.budget_bytes == MIN_BATCH_BYTES * 4
+    sizer.record(0.1)
+    assert sizer.budget_bytes == MIN_BATCH_BYTES * 5
+    for _ in range(10):
+        sizer.record(0.1)
+    assert sizer.budget_bytes == MIN_BATCH_BYTES * 8
+
+
+def test_write_batch_adaptive_splits_too_large():
+    sizer = AdaptiveBatchSizer(MIN_BATCH_BYTES * 8)
+    written = []
+
+    def write_batch(batch):
+        if len(batch) > 2:
+            raise sa.exc.OperationalError('INSERT', {}, PacketTooLarge('Got a packet bigger than max_allowed_packet'))
+        written.extend(batch)
+
+    write_batch_adaptive(sizer, list(range(8)), write_batch)
+    assert written == list(range(8))
+    assert sizer.target_bytes < MIN_BATCH_BYTES * 8
+
+
+def test_write_batch_adaptive_reraises():
+    sizer = AdaptiveBatchSizer(MIN_BATCH_BYTES)
+
+    def write_batch(batch):
+        raise sa.exc.OperationalError('INSERT', {}, Exception('something else'))
+
+    with pytest.raises(sa.exc.OperationalError):
+        write_batch_adaptive(sizer, [1, 2], write_batch)
+
+
+def test_write_session_does_not_split_too_large():
+    context = mock.Mock(batch_sizer=AdaptiveBatchSizer(MIN_BATCH_BYTES * 8))
+    session = DoltSQLWriteSession(context, mock.Mock())
+    written = []
+
+    def write_batch(batch):
+        if len(batch) > 2:
+            raise sa.exc.OperationalError('INSERT', {}, PacketTooLarge('Got a packet bigger than max_allowed_packet'))
+        written.extend(batch)
+
+    with pytest.raises(ValueError, match='too large'):
+        session._write_sized(list(range(8)), write_batch)
+    assert written == []
+    assert context.batch_sizer.target_bytes < MIN_BATCH_BYTES * 8
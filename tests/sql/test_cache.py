@@ -0,0 +1,66 @@
+import pandas as pd
+import pyarrow as pa
+from doltpy.sql import DoltSQLServerContext
+from doltpy.sql.cache import ResultCache, normalize_sql
+from doltpy.shared import arrow_to_pandas
+from dataclasses import replace
+from .helpers import TEST_SERVER_CONFIG, TEST_TABLE, TEST_DATA_INITIAL, TEST_DATA_UPDATE, compare_rows
+
+
+def test_normalize_sql():
+    assert normalize_sql('SELECT *\n  FROM `t`  AS OF "abc";') == 'SELECT * FROM `t` AS OF "abc"'
+    assert normalize_sql("SELECT 'a  b'") == "SELECT 'a  b'"
+
+
+def test_result_cache_eviction():
+    df = pd.DataFrame({'id': list(range(100))})
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    cache = ResultCache(2 * size)
+    cache.put('a', df)
+    cache.put('b', df)
+    assert cache.get('a') is not None
+    cache.put('c', df)
+    assert cache.get('b') is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (1, 1, 1, 2)
+
+
+def test_result_cache_copies():
+    cache = ResultCache(1024 * 1024)
+    cache.put('rows', [{'id': 1}])
+    cache.get('rows')[0]['id'] = 2
+    assert cache.get('rows') == [{'id': 1}]
+
+    cache.put('arrow', pa.table({'id': [1, 2]}))
+    arrow_to_pandas(cache.get('arrow'))
+    assert cache.get('arrow').column('id').to_pylist() == [1, 2]
+
+
+def test_read_result_cache(with_test_table):
+    dolt = with_test_table
+    server_config = replace(TEST_SERVER_CONFIG, result_cache_bytes=1024 * 1024)
+    with DoltSQLServerContext(dolt, server_config) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True)
+        for _ in range(2):
+            compare_rows(TEST_DATA_INITIAL, dssc.read_pandas(TEST_TABLE, first_commit).to_dict('records'), 'name')
+        assert dssc.result_cache.stats().hits == 1
+
+        # reads of a branch are never cached
+        dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True)
+        dssc.read_rows(TEST_TABLE, dolt.active_branch)
+        dssc.read_rows(TEST_TABLE, dolt.active_branch)
+        stats = dssc.result_cache.stats()
+        assert (stats.hits, stats.entries) == (1, 1)
+
+
+def test_diff_not_cached(with_test_table):
+    dolt = with_test_table
+    server_config = replace(TEST_SERVER_CONFIG, result_cache_bytes=1024 * 1024)
+    with DoltSQLServerContext(dolt, server_config) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True)
+        second_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True)
+        dssc.diff(first_commit, second_commit, TEST_TABLE)
+        dssc.execute(f'ALTER TABLE `{TEST_TABLE}` ADD COLUMN `age` INT')
+        diff = dssc.diff(first_commit, second_commit, TEST_TABLE)
+        assert 'to_age' in diff[TEST_TABLE].columns
+        assert dssc.result_cache.stats().entries == 0
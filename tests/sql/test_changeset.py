@@ -0,0 +1,33 @@
+import pytest
+from doltpy.sql import DoltSQLServerContext
+from doltpy.sql.changeset import get_changeset_query
+from .helpers import TEST_SERVER_CONFIG, TEST_TABLE, TEST_DATA_INITIAL, TEST_DATA_UPDATE
+
+
+def test_get_changeset_query():
+    query = get_changeset_query(TEST_TABLE, 'HEAD~1', 'HEAD', 'modified', ['adjective'], ['id'], 'to_id > 1')
+    assert '`to_id` AS `id`, `from_adjective`, `to_adjective`' in query
+    assert "DOLT_DIFF('HEAD~1', 'HEAD', 'characters')" in query
+    assert "diff_type = 'modified' AND (to_id > 1)" in query
+    with pytest.raises(ValueError):
+        get_changeset_query(TEST_TABLE, 'HEAD~1', 'HEAD', 'changed', [], ['id'])
+
+
+def test_changeset(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True)
+        dssc.execute(f'DELETE FROM {TEST_TABLE} WHERE id = 1')
+        dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True)
+
+        changeset = dssc.changeset('HEAD~1', 'HEAD', TEST_TABLE, columns=['date_of_death'])[TEST_TABLE]
+        assert changeset.inserts['id'].tolist() == [4]
+        assert changeset.deletes['id'].tolist() == [1]
+        assert list(changeset.updates.columns) == ['id', 'from_date_of_death', 'to_date_of_death']
+        assert changeset.updates['id'].tolist() == [2]
+
+        filtered = dssc.changeset('HEAD~1', 'HEAD', [TEST_TABLE], where='to_id > 10', parallelism=2)[TEST_TABLE]
+        assert filtered.inserts.empty
+
+        chunks = list(dssc.iter_changeset('HEAD~1', 'HEAD', TEST_TABLE, 'added', chunk_size=1))
+        assert [len(chunk) for chunk in chunks] == [1]
@@ -0,0 +1,65 @@
+import os
+import time
+from dataclasses import replace
+from subprocess import Popen
+
+import pytest
+
+from doltpy.sql import DoltSQLServerContext
+from doltpy.sql.daemon import STATE_FILE, ServerDaemon, is_process_running
+from .helpers import TEST_SERVER_CONFIG
+
+
+def test_server_daemon(tmp_path):
+    daemon = ServerDaemon(str(tmp_path), idle_timeout=600)
+    procs = []
+
+    def start_server():
+        procs.append(Popen(['sleep', '600']))
+        return procs[-1].pid
+
+    assert daemon.attach('127.0.0.1', 3306, start_server)
+    assert not daemon.attach('127.0.0.1', 3306, start_server)
+    assert len(procs) == 1
+    with pytest.raises(ValueError):
+        daemon.attach('127.0.0.1', 3307, start_server)
+
+    daemon.detach()
+    assert daemon.check()
+    daemon.detach()
+    assert daemon.check() and is_process_running(procs[0].pid)
+
+    assert not ServerDaemon(str(tmp_path), idle_timeout=0).check()
+    assert not is_process_running(procs[0].pid)
+    assert not os.path.exists(tmp_path / STATE_FILE)
+
+
+def test_watchdog_stops_idle_server(tmp_path):
+    daemon = ServerDaemon(str(tmp_path), idle_timeout=0.5)
+    proc = Popen(['sleep', '600'])
+    daemon.attach('127.0.0.1', 3306, lambda: proc.pid)
+    daemon.detach()
+
+    deadline = time.time() + 10
+    while os.path.exists(tmp_path / STATE_FILE) and time.time() < deadline:
+        time.sleep(0.1)
+    assert not is_process_running(proc.pid)
+    assert not os.path.exists(tmp_path / STATE_FILE)
+
+
+def test_daemon_context(init_empty_test_repo):
+    dolt = init_empty_test_repo
+    server_config = replace(TEST_SERVER_CONFIG, daemon=True, daemon_idle_timeout=600)
+    with DoltSQLServerContext(dolt, server_config) as first:
+        pid = first.server.pid
+        with DoltSQLServerContext(dolt, server_config) as second:
+            assert second.server is None
+            assert second.tables() == []
+
+    assert is_process_running(pid)
+    with DoltSQLServerContext(dolt, server_config) as third:
+        assert third.server is None
+        assert third.verify_connection()
+
+    assert not ServerDaemon(dolt.repo_dir, idle_timeout=0).check()
+    assert not is_process_running(pid)
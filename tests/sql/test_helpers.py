@@ -0,0 +1,116 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from mysql.connector import FieldType
+from sqlalchemy import MetaData, String, Text, create_engine
+
+from doltpy.sql.helpers import (
+    clean_columns,
+    clean_types,
+    concat_frames,
+    finish_column_buffer,
+    get_column_buffer,
+    get_insert_statement,
+    infer_table_schema,
+    iter_column_batches,
+    record_batches_to_table,
+    rows_to_record_batch,
+    to_sql_literal,
+)
+
+
+@pytest.mark.parametrize('values, expected', [
+    ([1.0, float('nan'), None], [1.0, None, None]),
+    (['a', None], ['a', None]),
+    ([pd.Timestamp('2020-01-01 10:00'), pd.NaT], [datetime.datetime(2020, 1, 1, 10), None]),
+    ([datetime.datetime(2020, 1, 1), None], [datetime.datetime(2020, 1, 1), None]),
+    ([datetime.date(2020, 1, 2), None], [datetime.datetime(2020, 1, 2), None]),
+    ([[1, None], [], None], ['1,NULL', None, None]),
+    ([{'a': 1}, None], ["{'a': 1}", None]),
+    ([1, 'a', datetime.date(2020, 1, 1), np.nan], [1, 'a', datetime.datetime(2020, 1, 1), None]),
+])
+def test_clean_columns(values, expected):
+    assert clean_columns([values]) == [expected]
+
+
+def test_clean_types():
+    rows = [{'id': 1, 'value': np.nan}, {'id': 2, 'value': 0.5}]
+    assert clean_types(rows) == [{'id': 1, 'value': None}, {'id': 2, 'value': 0.5}]
+    assert clean_types([{'id': 1}, {'value': np.nan}]) == [{'id': 1}, {'value': None}]
+
+
+def test_concat_frames():
+    frames = [
+        pd.DataFrame({'id': [1, 2], 'age': [28, 30], 'died': [datetime.datetime(1877, 1, 1), None]}),
+        pd.DataFrame({'id': [3], 'age': [None], 'died': [None]}),
+    ]
+    frame = concat_frames(frames)
+    assert frame['id'].tolist() == [1, 2, 3]
+    assert frame['age'].dtype == np.float64
+    assert pd.api.types.is_datetime64_any_dtype(frame['died'])
+
+
+def test_get_insert_statement():
+    assert get_insert_statement('t', ('id', 'name'), ('id',), True, 2) == (
+        'INSERT INTO `t` (`id`, `name`) VALUES (%s, %s), (%s, %s) ON DUPLICATE KEY UPDATE `name` = VALUES(`name`)'
+    )
+    assert get_insert_statement('t', ('id',), ('id',), False, 1) == 'INSERT INTO `t` (`id`) VALUES (%s)'
+
+
+def test_infer_table_schema():
+    metadata = MetaData(bind=create_engine('sqlite://'))
+    rows = [{'id': 'a', 'name': 'Anna', 'age': 28}, {'id': 'b', 'name': None, 'age': None}]
+    table = infer_table_schema(metadata, 'characters', rows, ['id'])
+    assert isinstance(table.columns['id'].type, String) and table.columns['id'].type.length == 255
+    assert isinstance(table.columns['name'].type, Text)
+
+
+def test_iter_column_batches_pandas():
+    df = pd.DataFrame({
+        'id': pd.array([1, None, 3], dtype='Int64'),
+        'date': pd.to_datetime(['2020-01-01', None, '2020-01-03']),
+    })
+    batches = [clean_columns(batch) for _, batch in iter_column_batches({col: df[col] for col in df.columns}, 2)]
+    assert batches == [
+        [[1, None], [datetime.datetime(2020, 1, 1), None]],
+        [[3], [datetime.datetime(2020, 1, 3)]],
+    ]
+
+
+def test_record_batches_to_table():
+    columns, arrow_types = ['id', 'name'], [pa.int64(), None]
+    record_batches = [
+        rows_to_record_batch(columns, arrow_types, [(1, None), (2, None)]),
+        rows_to_record_batch(columns, arrow_types, [(3, 'c')]),
+    ]
+    table = record_batches_to_table(columns, arrow_types, record_batches)
+    assert table.schema.field('name').type == pa.string()
+    assert table.to_pydict() == {'id': [1, 2, 3], 'name': [None, None, 'c']}
+    assert record_batches_to_table(columns, arrow_types, []).column_names == columns
+
+
+def test_get_column_buffer():
+    buffer = get_column_buffer(('id', FieldType.LONGLONG), typed=True)
+    buffer.extend((1, 2))
+    buffer.extend((3, None))
+    column = finish_column_buffer(buffer)
+    assert column.dtype == np.int64
+    assert column.tolist() == [1, 2, 3, None]
+    unsigned = ('id', FieldType.LONGLONG, None, None, None, None, 0, 32)
+    assert finish_column_buffer(get_column_buffer(unsigned, typed=True)).dtype == np.uint64
+    assert get_column_buffer(('id', FieldType.LONGLONG)) == []
+    assert get_column_buffer(('name', FieldType.VAR_STRING), typed=True) == []
+
+
+@pytest.mark.parametrize('val, expected', [
+    (1, '1'),
+    ("O'Brien", "'O''Brien'"),
+    (datetime.datetime(2020, 1, 2, 3, 4, 5), "'2020-01-02 03:04:05'"),
+    (datetime.date(2020, 1, 2), "'2020-01-02'"),
+    (b'\x01', "X'01'"),
+])
+def test_to_sql_literal(val, expected):
+    assert to_sql_literal(val) == expected
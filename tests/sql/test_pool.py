@@ -0,0 +1,29 @@
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from doltpy.sql.pool import PoolMonitor
+
+
+def test_pool_monitor(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "test.db"}', poolclass=QueuePool, pool_size=1, max_overflow=0)
+    monitor = PoolMonitor(engine, pool_size=1, max_overflow=0)
+
+    conn = engine.connect()
+    stats = monitor.stats()
+    assert (stats.connects, stats.checkouts, stats.checked_out) == (1, 1, 1)
+
+    def wait_for_connection():
+        with monitor.acquire():
+            engine.connect().close()
+
+    waiter = threading.Thread(target=wait_for_connection)
+    waiter.start()
+    waiter.join(0.1)
+    conn.close()
+    waiter.join()
+
+    stats = monitor.stats()
+    assert (stats.checkouts, stats.checked_out, stats.peak_checked_out, stats.waits) == (2, 0, 1, 1)
+    assert stats.wait_seconds > 0
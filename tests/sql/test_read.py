@@ -1,5 +1,8 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 from doltpy.sql import DoltSQLServerContext
-from doltpy.shared import columns_to_rows
+from doltpy.shared import arrow_to_pandas, columns_to_rows
 from .helpers import (TEST_SERVER_CONFIG,
                                       TEST_TABLE,
                                       TEST_DATA_INITIAL,
@@ -30,6 +33,22 @@ def test_read_columns(with_test_table):
         compare_rows(TEST_DATA_FINAL, columns_to_rows(expected_second_write), 'name')
 
 
+def test_read_columns_typed(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL)
+        columns = dssc.read_columns_sql(
+            f'SELECT id, CASE WHEN id = 2 THEN NULL ELSE id END AS odd_id, name FROM `{TEST_TABLE}` ORDER BY id',
+            batch_size=2,
+            typed=True
+        )
+        assert isinstance(columns['id'], np.ma.MaskedArray) and columns['id'].dtype == np.int64
+        assert isinstance(columns['odd_id'], np.ma.MaskedArray) and columns['odd_id'].dtype == np.int64
+        assert columns['odd_id'].tolist() == [1, None, 3]
+        assert columns['name'] == ['Anna', 'Vronksy', 'Oblonksy']
+        assert dssc.read_columns(TEST_TABLE)['id'] == [1, 2, 3]
+
+
 def test_read_pandas(with_test_table):
     dolt = with_test_table
     with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
@@ -40,3 +59,66 @@ def test_read_pandas(with_test_table):
         expected_second_write = dssc.read_pandas(TEST_TABLE, second_commit).to_dict('records')
         compare_rows(TEST_DATA_FINAL, expected_second_write, 'name')
 
+
+
+def test_iter_rows(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True)
+        dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True)
+        compare_rows(TEST_DATA_INITIAL, list(dssc.iter_rows(TEST_TABLE, first_commit, batch_size=2)), 'name')
+        compare_rows(TEST_DATA_FINAL, list(dssc.iter_rows(TEST_TABLE)), 'name')
+
+
+def test_iter_batches(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        dssc.write_rows(TEST_TABLE, TEST_DATA_FINAL, commit=True)
+        batches = list(dssc.iter_batches(TEST_TABLE, batch_size=3))
+        assert [len(batch) for batch in batches] == [3, 1]
+
+        # stopping early leaves the connection usable
+        next(dssc.iter_batches(TEST_TABLE, batch_size=1))
+        assert len(dssc.read_rows(TEST_TABLE)) == len(TEST_DATA_FINAL)
+
+
+def test_iter_pandas(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        dssc.write_rows(TEST_TABLE, TEST_DATA_FINAL, commit=True)
+        dtypes = {'id': 'Int64', 'date_of_death': 'datetime64[ns]'}
+        chunks = list(dssc.iter_pandas(TEST_TABLE, chunk_size=3, dtypes=dtypes))
+        assert [len(chunk) for chunk in chunks] == [3, 1]
+        for chunk in chunks:
+            assert chunk.dtypes['id'] == 'Int64'
+            assert chunk.dtypes['date_of_death'] == 'datetime64[ns]'
+        compare_rows(TEST_DATA_FINAL, pd.concat(chunks).to_dict('records'), 'name')
+
+
+def test_read_arrow(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True)
+        dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True)
+        first_write = dssc.read_arrow(TEST_TABLE, first_commit, batch_size=2)
+        assert first_write.schema.field('id').type == pa.int64()
+        compare_rows(TEST_DATA_INITIAL, first_write.to_pylist(), 'name')
+        compare_rows(TEST_DATA_FINAL, arrow_to_pandas(dssc.read_arrow(TEST_TABLE)).to_dict('records'), 'name')
+
+        empty = dssc.read_arrow_sql(f'SELECT * FROM {TEST_TABLE} WHERE id < 0')
+        assert empty.num_rows == 0
+        assert set(empty.column_names) == set(TEST_DATA_INITIAL[0].keys())
+
+
+def test_read_pandas_parallel(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True)
+        dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True)
+        first_write = dssc.read_pandas(TEST_TABLE, first_commit, parallelism=2)
+        compare_rows(TEST_DATA_INITIAL, first_write.to_dict('records'), 'name')
+        dssc.write_rows(TEST_TABLE, [{'name': 'Kitty', 'adjective': 'kind', 'id': 5, 'date_of_death': None}])
+        second_write = dssc.read_pandas(TEST_TABLE, parallelism=3)
+        assert second_write['id'].tolist() == sorted(row['id'] for row in TEST_DATA_FINAL)
+        assert pd.api.types.is_datetime64_any_dtype(second_write['date_of_death'])
+        compare_rows(TEST_DATA_FINAL, second_write.to_dict('records'), 'name')
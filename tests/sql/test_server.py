@@ -0,0 +1,37 @@
+import socket
+import sys
+from subprocess import Popen
+
+import pytest
+
+from doltpy.sql.server import ServerStartupError, is_port_open, poll_until_ready
+
+
+def test_poll_until_ready():
+    calls = []
+
+    def probe():
+        calls.append(None)
+        return len(calls) == 3
+
+    assert poll_until_ready(probe, timeout=1) < 1
+    assert len(calls) == 3
+
+    with pytest.raises(ServerStartupError):
+        poll_until_ready(lambda: False, timeout=0.05)
+
+
+def test_poll_until_ready_process_exit():
+    proc = Popen([sys.executable, '-c', 'exit(3)'])
+    proc.wait()
+    with pytest.raises(ServerStartupError, match='code 3'):
+        poll_until_ready(lambda: False, proc, timeout=5)
+
+
+def test_is_port_open():
+    with socket.socket() as listener:
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        port = listener.getsockname()[1]
+        assert is_port_open('127.0.0.1', port)
+    assert not is_port_open('127.0.0.1', port)
@@ -0,0 +1,166 @@
+import os
+import shutil
+from dataclasses import replace
+
+import pytest
+
+from doltpy.cli import Dolt
+from doltpy.sql import DoltSQLServerPool, ROUTING_LEAST_LOADED, ROUTING_ROUND_ROBIN
+from .helpers import TEST_SERVER_CONFIG, TEST_DATA_INITIAL, compare_rows
+
+TEST_TABLE = 'characters'
+
+
+@pytest.fixture()
+def with_test_table_data(init_empty_test_repo):
+    dolt = init_empty_test_repo
+    dolt.sql(query=f'''
+        CREATE TABLE `{TEST_TABLE}` (
+            `name` VARCHAR(32),
+            `adjective` VARCHAR(32),
+            `id` INT NOT NULL,
+            `date_of_death` DATETIME,
+            PRIMARY KEY (`id`)
+        );
+    ''')
+    values = ", ".join(f"('{row['name']}', '{row['adjective']}', {row['id']})" for row in TEST_DATA_INITIAL)
+    dolt.sql(query=f'INSERT INTO `{TEST_TABLE}` (`name`, `adjective`, `id`) VALUES {values}')
+    dolt.add(TEST_TABLE)
+    dolt.commit('Created test table')
+    return dolt
+
+
+@pytest.mark.parametrize('routing', [ROUTING_ROUND_ROBIN, ROUTING_LEAST_LOADED])
+def test_read_routing(with_test_table_data, routing):
+    dolt = with_test_table_data
+    with DoltSQLServerPool(dolt, TEST_SERVER_CONFIG, replicas=2, routing=routing) as pool:
+        for _ in range(4):
+            assert len(pool.read_rows(TEST_TABLE)) == len(TEST_DATA_INITIAL)
+        assert len(pool.read_pandas(TEST_TABLE, parallelism=2)) == len(TEST_DATA_INITIAL)
+
+        assert [stats.checkouts >= 2 for stats in pool.replica_pool_stats()] == [True, True]
+        assert [replica.server_config.port for replica in pool.replicas] == [
+            TEST_SERVER_CONFIG.port + 1,
+            TEST_SERVER_CONFIG.port + 2,
+        ]
+        assert all(replica.server_config.readonly for replica in pool.replicas)
+        clone_dirs = [replica.dolt.repo_dir for replica in pool.replicas]
+        assert dolt.repo_dir not in clone_dirs and len(set(clone_dirs)) == 2
+
+    assert pool.server is None and all(replica.server is None for replica in pool.replicas)
+    assert not any(os.path.exists(clone_dir) for clone_dir in clone_dirs)
+
+
+def test_writes_go_to_primary(with_test_table_data):
+    dolt = with_test_table_data
+    update = [{'name': 'Levin', 'adjective': 'tiresome', 'id': 4, 'date_of_death': None}]
+    with DoltSQLServerPool(dolt, TEST_SERVER_CONFIG, replicas=1) as pool:
+        before = [replica_stats.checkouts for replica_stats in pool.replica_pool_stats()]
+        pool.write_rows(TEST_TABLE, update, commit=True, commit_message='Add Levin')
+        with pool.write_session() as session:
+            rows = session.read_rows(TEST_TABLE)
+
+        assert [replica_stats.checkouts for replica_stats in pool.replica_pool_stats()] == before
+    compare_rows(TEST_DATA_INITIAL + update, rows, 'id')
+
+
+def test_read_after_write(with_test_table_data):
+    dolt = with_test_table_data
+    update = [{'name': 'Levin', 'adjective': 'tiresome', 'id': 4, 'date_of_death': None}]
+
+    def replica_checkouts(pool):
+        return sum(stats.checkouts for stats in pool.replica_pool_stats())
+
+    with DoltSQLServerPool(dolt, TEST_SERVER_CONFIG, replicas=2) as pool:
+        before = replica_checkouts(pool)
+        assert len(pool.read_rows(TEST_TABLE)) == len(TEST_DATA_INITIAL)
+        assert replica_checkouts(pool) > before
+
+        # uncommitted writes are only visible on the primary
+        pool.write_rows(TEST_TABLE, update)
+        before = replica_checkouts(pool)
+        compare_rows(TEST_DATA_INITIAL + update, pool.read_rows(TEST_TABLE), 'id')
+        assert replica_checkouts(pool) == before
+
+        # so are commits made after the replicas were started
+        pool.commit_tables('Add Levin', TEST_TABLE)
+        compare_rows(TEST_DATA_INITIAL + update, pool.read_rows(TEST_TABLE), 'id')
+        assert len(pool.read_pandas(TEST_TABLE, parallelism=2)) == len(TEST_DATA_INITIAL) + 1
+        assert replica_checkouts(pool) == before
+
+
+def test_entry_points_routing(with_test_table_data):
+    dolt = with_test_table_data
+    to_commit, from_commit = list(dolt.log().keys())[:2]
+    query = f'SELECT * FROM `{TEST_TABLE}`'
+    reads = {
+        'read_rows': lambda pool: pool.read_rows(TEST_TABLE),
+        'read_columns': lambda pool: pool.read_columns(TEST_TABLE),
+        'read_pandas': lambda pool: pool.read_pandas(TEST_TABLE),
+        'read_arrow': lambda pool: pool.read_arrow(TEST_TABLE),
+        'read_rows_sql': lambda pool: pool.read_rows_sql(query),
+        'read_columns_sql': lambda pool: pool.read_columns_sql(query),
+        'read_pandas_sql': lambda pool: pool.read_pandas_sql(query),
+        'read_arrow_sql': lambda pool: pool.read_arrow_sql(query),
+        'iter_rows': lambda pool: list(pool.iter_rows(TEST_TABLE)),
+        'iter_batches': lambda pool: list(pool.iter_batches(TEST_TABLE)),
+        'iter_pandas': lambda pool: list(pool.iter_pandas(TEST_TABLE)),
+        'iter_rows_sql': lambda pool: list(pool.iter_rows_sql(query)),
+        'iter_batches_sql': lambda pool: list(pool.iter_batches_sql(query)),
+        'iter_pandas_sql': lambda pool: list(pool.iter_pandas_sql(query)),
+        'iter_changeset': lambda pool: list(pool.iter_changeset(from_commit, to_commit, TEST_TABLE, 'added')),
+        'diff': lambda pool: pool.diff(from_commit, to_commit, TEST_TABLE),
+        'changeset': lambda pool: pool.changeset(from_commit, to_commit, TEST_TABLE),
+    }
+    writes = {
+        'execute': lambda pool: pool.execute(f"UPDATE `{TEST_TABLE}` SET `adjective` = 'sad' WHERE `id` = 1"),
+        'commit_tables': lambda pool: pool.commit_tables('Make Anna sad', TEST_TABLE),
+    }
+    assert set(reads) == {name for name in dir(DoltSQLServerPool) if name.startswith(('read_', 'iter_'))} | {
+        'diff', 'changeset'
+    }
+
+    def replica_checkouts(pool):
+        return sum(stats.checkouts for stats in pool.replica_pool_stats())
+
+    with DoltSQLServerPool(dolt, TEST_SERVER_CONFIG, replicas=1) as pool:
+        for name, read in reads.items():
+            before = replica_checkouts(pool)
+            read(pool)
+            assert replica_checkouts(pool) > before, f'{name} did not read from a replica'
+
+        for name, write in writes.items():
+            before, primary_before = replica_checkouts(pool), pool.pool_stats().checkouts
+            write(pool)
+            assert replica_checkouts(pool) == before, f'{name} used a replica'
+            assert pool.pool_stats().checkouts > primary_before, f'{name} did not use the primary'
+
+
+def test_replica_dirs(with_test_table_data, tmp_path):
+    dolt = with_test_table_data
+    shutil.copytree(dolt.repo_dir, tmp_path / 'clone')
+    clone = Dolt(str(tmp_path / 'clone'))
+    with DoltSQLServerPool(dolt, TEST_SERVER_CONFIG, replica_dirs=[clone.repo_dir]) as pool:
+        assert pool.replicas[0].dolt.repo_dir == clone.repo_dir
+        assert len(pool.read_rows(TEST_TABLE)) == len(TEST_DATA_INITIAL)
+        assert pool.replica_pool_stats()[0].checkouts == 2
+
+    # a clone behind the primary is not read from
+    dolt.sql(query=f"INSERT INTO `{TEST_TABLE}` (`name`, `adjective`, `id`) VALUES ('Levin', 'tiresome', 4)")
+    dolt.add(TEST_TABLE)
+    dolt.commit('Add Levin')
+    with DoltSQLServerPool(dolt, TEST_SERVER_CONFIG, replica_dirs=[clone.repo_dir]) as pool:
+        assert len(pool.read_rows(TEST_TABLE)) == len(TEST_DATA_INITIAL) + 1
+        assert pool.replica_pool_stats()[0].checkouts == 1
+    assert os.path.exists(clone.repo_dir)
+
+
+def test_invalid_arguments(init_empty_test_repo):
+    with pytest.raises(ValueError):
+        DoltSQLServerPool(init_empty_test_repo, TEST_SERVER_CONFIG, routing='random')
+    with pytest.raises(ValueError):
+        DoltSQLServerPool(init_empty_test_repo, replace(TEST_SERVER_CONFIG, config='server.yaml'))
+    with pytest.raises(ValueError):
+        DoltSQLServerPool(init_empty_test_repo, TEST_SERVER_CONFIG, replicas=0)
+    with pytest.raises(ValueError):
+        DoltSQLServerPool(init_empty_test_repo, TEST_SERVER_CONFIG, replicas=2, replica_dirs=['clone'])
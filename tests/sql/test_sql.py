@@ -5,6 +5,7 @@ import shutil
 from subprocess import Popen
 import tempfile
 import time
+from dataclasses import replace
 
 import pytest
 from doltpy.cli import Dolt
@@ -39,10 +40,36 @@ def _add_test_table(dolt: Dolt, table_name: str):
 
 def test_context_manager_cleanup(init_empty_test_repo):
     dolt = init_empty_test_repo
-    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as _:
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
         assert _count_proc_helper('running') + _count_proc_helper('sleeping') >= 1
+        server = dssc.server
+
+    # the server is stopped with SIGTERM and reaped
+    assert server.returncode is not None
+    assert server.pid not in [proc.pid for proc in psutil.Process().children(recursive=True)]
+
+
+def test_server_metrics(init_empty_test_repo):
+    server_config = replace(TEST_SERVER_CONFIG, metrics_interval=0.1)
+    with DoltSQLServerContext(init_empty_test_repo, server_config) as dssc:
+        with dssc.engine.connect():
+            time.sleep(0.3)
+            metrics = dssc.server_metrics_history()[-1]
+        assert metrics.pid == dssc.server.pid
+        assert metrics.rss_bytes > 0 and metrics.connections >= 1
+        assert dssc.server_metrics() is not None
+
 
-    assert _count_proc_helper('zombie') >= 1
+def test_server_restart(init_empty_test_repo):
+    with DoltSQLServerContext(init_empty_test_repo, TEST_SERVER_CONFIG) as dssc:
+        crashed = dssc.server
+        crashed.kill()
+        deadline = time.time() + 30
+        while dssc.server is crashed and time.time() < deadline:
+            time.sleep(0.1)
+        assert dssc.server is not crashed
+        assert dssc.supervisor.restarts == 1
+        assert dssc.tables() == []
 
 
 def _count_proc_helper(status: str):
@@ -104,3 +131,96 @@ def test_log_file(sql_server, tmp_path):
     with DoltSQLServerContext(sql_server, conf) as conn:
         time.sleep(.5)
         assert len(log_file.open().read()) > 0
+
+
+def test_table_metadata_cache(with_test_tables):
+    dolt = with_test_tables
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        assert dssc.get_table('missing') is None
+        table = dssc.get_table(TEST_TABLE_ONE)
+        assert dssc.get_table(TEST_TABLE_ONE) is table
+
+        dssc.execute(f'ALTER TABLE `{TEST_TABLE_ONE}` ADD COLUMN `age` INT')
+        assert 'age' in dssc.get_table(TEST_TABLE_ONE).columns
+
+        dssc.get_table(TEST_TABLE_TWO)
+        # schema changes made without going through execute are picked up from the schema hash
+        with dssc.engine.connect() as conn:
+            conn.execute(f'ALTER TABLE `{TEST_TABLE_TWO}` ADD COLUMN `age` INT')
+        dssc.write_rows(TEST_TABLE_TWO, [dict(row, age=30) for row in TEST_DATA_INITIAL])
+        assert 'age' in dssc.get_table(TEST_TABLE_TWO).columns
+
+
+def test_write_session(with_test_tables):
+    dolt = with_test_tables
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        with dssc.write_session(COMMIT_MESSAGE) as session:
+            session.write_rows(TEST_TABLE_ONE, TEST_DATA_INITIAL, batch_size=1)
+            session.write_rows(TEST_TABLE_TWO, TEST_DATA_INITIAL)
+        assert session.tables_written == [TEST_TABLE_ONE, TEST_TABLE_TWO]
+        assert len(dssc.read_rows(TEST_TABLE_ONE, session.commit_hash)) == len(TEST_DATA_INITIAL)
+
+        with pytest.raises(RuntimeError):
+            with dssc.write_session(COMMIT_MESSAGE) as session:
+                session.execute(f'DELETE FROM `{TEST_TABLE_ONE}`')
+                raise RuntimeError('abort the load')
+        assert len(dssc.read_rows(TEST_TABLE_ONE)) == len(TEST_DATA_INITIAL)
+
+    _, commit = dolt.log().popitem(last=False)
+    assert commit.message == COMMIT_MESSAGE
+
+
+def test_write_session_does_not_commit_writes(with_test_tables):
+    dolt = with_test_tables
+    commits_before = len(dolt.log())
+    columns = {col: [row[col] for row in TEST_DATA_INITIAL] for col in TEST_DATA_INITIAL[0]}
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        with pytest.raises(RuntimeError):
+            with dssc.write_session(COMMIT_MESSAGE) as session:
+                session.write_columns(TEST_TABLE_ONE, columns)
+                raise RuntimeError('abort the load')
+        assert len(dssc.read_rows(TEST_TABLE_ONE)) == 0
+
+        with pytest.raises(ValueError):
+            with dssc.write_session(COMMIT_MESSAGE) as session:
+                session.write_columns(TEST_TABLE_ONE, columns, commit=True, commit_message=COMMIT_MESSAGE)
+
+    assert len(dolt.log()) == commits_before
+
+
+def test_commit_graph(with_test_tables):
+    dolt = with_test_tables
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE_ONE, TEST_DATA_INITIAL, commit=True)
+        assert list(dssc.log().keys())[0] == first_commit
+
+        second_commit = dssc.write_rows(TEST_TABLE_TWO, TEST_DATA_INITIAL, commit=True)
+        commits = dssc.log()
+        assert list(commits.keys())[:2] == [second_commit, first_commit]
+        assert len(commits) == len(dolt.log())
+
+        graph = dssc.get_commit_graph()
+        assert graph.head == second_commit
+        assert graph.get_parents(second_commit) == (first_commit,)
+        assert graph.is_ancestor(first_commit, second_commit)
+        assert not graph.is_ancestor(second_commit, first_commit)
+        assert graph.merge_base(first_commit, second_commit) == first_commit
+        assert graph.commit_as_of(commits[first_commit].timestamp) == first_commit
+
+
+def test_pool_stats(with_test_tables):
+    dolt = with_test_tables
+    server_config = replace(TEST_SERVER_CONFIG, pool_size=2, max_overflow=1, pool_pre_ping=True)
+    with DoltSQLServerContext(dolt, server_config) as dssc:
+        dssc.write_rows(TEST_TABLE_ONE, TEST_DATA_INITIAL)
+        dssc.read_rows(TEST_TABLE_ONE)
+        stats = dssc.pool_stats()
+        assert stats.pool_size == 2 and stats.max_overflow == 1
+        assert stats.checkouts >= 2 and stats.checked_out == 0
+        assert 1 <= stats.connects <= 3
+
+
+def test_startup_latency(init_empty_test_repo):
+    with DoltSQLServerContext(init_empty_test_repo, TEST_SERVER_CONFIG) as dssc:
+        assert dssc.startup_seconds is not None and dssc.startup_seconds < TEST_SERVER_CONFIG.startup_timeout
+        assert dssc.verify_connection()
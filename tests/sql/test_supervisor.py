@@ -0,0 +1,99 @@
+import signal
+import sys
+import threading
+import time
+from subprocess import Popen
+
+from doltpy.shared.system_helpers import PROCESSES
+from doltpy.sql.supervisor import ServerSupervisor, terminate_process
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_metrics():
+    supervisor = ServerSupervisor(lambda: Popen(['sleep', '600']), metrics_interval=0.05)
+    proc = supervisor.start()
+    assert proc.pid in PROCESSES
+    try:
+        assert _wait_for(lambda: len(supervisor.metrics_history()) >= 2)
+        metrics = supervisor.metrics()
+        assert metrics.pid == proc.pid and metrics.rss_bytes > 0 and metrics.restarts == 0
+        assert metrics.connections == 0 and metrics.open_files >= 0
+    finally:
+        supervisor.stop()
+
+    assert proc.returncode == -signal.SIGTERM
+    assert proc.pid not in PROCESSES
+
+
+def test_restart_after_crash():
+    restarted = []
+    supervisor = ServerSupervisor(lambda: Popen(['sleep', '600']), on_restart=restarted.append, metrics_interval=0.05)
+    proc = supervisor.start()
+    try:
+        proc.kill()
+        assert _wait_for(lambda: restarted)
+        assert restarted[0].pid != proc.pid and restarted[0].poll() is None
+        assert supervisor.proc is restarted[0] and supervisor.restarts == 1
+        assert _wait_for(lambda: any(m.pid == restarted[0].pid for m in supervisor.metrics_history()))
+    finally:
+        supervisor.stop()
+
+    assert restarted[0].returncode == -signal.SIGTERM
+
+
+def test_max_restarts():
+    supervisor = ServerSupervisor(lambda: Popen(['sleep', '600']), metrics_interval=0.05, max_restarts=0)
+    proc = supervisor.start()
+    proc.kill()
+    supervisor.thread.join(10)
+    assert not supervisor.thread.is_alive() and supervisor.restarts == 0
+    supervisor.stop()
+
+
+def test_metrics_after_crash():
+    supervisor = ServerSupervisor(lambda: Popen(['sleep', '600']), metrics_interval=0.05, max_restarts=0)
+    proc = supervisor.start()
+    assert _wait_for(lambda: supervisor.metrics_history())
+    proc.kill()
+    supervisor.thread.join(10)
+    assert supervisor.metrics() is None
+    assert supervisor.metrics_history()[-1].pid == proc.pid
+    supervisor.stop()
+
+
+def test_stop_waits_for_restart():
+    entered, release = threading.Event(), threading.Event()
+    restarted = []
+
+    def on_restart(proc):
+        restarted.append(proc)
+        entered.set()
+        release.wait(10)
+
+    supervisor = ServerSupervisor(lambda: Popen(['sleep', '600']), on_restart=on_restart, metrics_interval=0.05)
+    supervisor.start().kill()
+    assert entered.wait(10)
+    stopper = threading.Thread(target=supervisor.stop)
+    stopper.start()
+    stopper.join(0.2)
+    assert stopper.is_alive()
+    release.set()
+    stopper.join(10)
+    assert not stopper.is_alive() and len(restarted) == 1
+    assert restarted[0].returncode == -signal.SIGTERM
+
+
+def test_terminate_process_drain_timeout():
+    ignore_sigterm = (
+        'import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print(flush=True); time.sleep(600)'
+    )
+    proc = Popen([sys.executable, '-c', ignore_sigterm], stdout=-1)
+    proc.stdout.readline()
+    terminate_process(proc, drain_timeout=0.2)
+    assert proc.returncode == -signal.SIGKILL
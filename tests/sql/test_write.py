@@ -1,4 +1,5 @@
-from doltpy.sql import DoltSQLServerContext
+from dataclasses import replace
+from doltpy.sql import DoltSQLServerContext, WRITE_MODE_EXECUTEMANY, WRITE_MODE_LOAD_DATA
 from .helpers import (
     TEST_SERVER_CONFIG,
     TEST_TABLE,
@@ -8,8 +9,11 @@ from .helpers import (
     compare_rows
 )
 from doltpy.shared import rows_to_columns
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import pytest
+from unittest import mock
 
 
 def test_write_columns(with_test_table):
@@ -56,3 +60,98 @@ def test_write_file(with_test_table, with_test_data_initial_file, with_test_data
         actual_asof_second_commit = dssc.read_rows(TEST_TABLE, second_commit)
         compare_rows(TEST_DATA_INITIAL, actual_asof_first_commit, 'name')
         compare_rows(TEST_DATA_FINAL, actual_asof_second_commit, 'name')
+
+
+def test_write_rows_generator(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        commit = dssc.write_rows(TEST_TABLE, (row for row in TEST_DATA_INITIAL), commit=True, batch_size=2)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, commit), 'name')
+
+
+def test_write_rows_create_from_generator(init_empty_test_repo):
+    dolt = init_empty_test_repo
+    data = [{'id': i, 'name': f'name_{i}'} for i in range(10)]
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        dssc.write_rows('generated', iter(data), create_if_not_exists=True, primary_key=['id'], batch_size=3)
+        compare_rows(data, dssc.read_rows('generated'), 'id')
+
+
+def test_write_rows_load_data(with_test_table):
+    dolt = with_test_table
+    server_config = replace(TEST_SERVER_CONFIG, allow_local_infile=True)
+    with DoltSQLServerContext(dolt, server_config) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True, write_mode=WRITE_MODE_LOAD_DATA)
+        second_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True, write_mode=WRITE_MODE_LOAD_DATA)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, first_commit), 'name')
+        compare_rows(TEST_DATA_FINAL, dssc.read_rows(TEST_TABLE, second_commit), 'name')
+
+
+def test_write_rows_load_data_requires_local_infile(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        with pytest.raises(ValueError):
+            dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, write_mode=WRITE_MODE_LOAD_DATA)
+
+
+def test_write_rows_parallel(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True, batch_size=1, parallelism=3)
+        second_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True, batch_size=1, parallelism=3)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, first_commit), 'name')
+        compare_rows(TEST_DATA_FINAL, dssc.read_rows(TEST_TABLE, second_commit), 'name')
+
+
+def test_write_rows_executemany(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        first_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_INITIAL, commit=True, write_mode=WRITE_MODE_EXECUTEMANY)
+        second_commit = dssc.write_rows(TEST_TABLE, TEST_DATA_UPDATE, commit=True, write_mode=WRITE_MODE_EXECUTEMANY)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, first_commit), 'name')
+        compare_rows(TEST_DATA_FINAL, dssc.read_rows(TEST_TABLE, second_commit), 'name')
+
+
+@pytest.mark.parametrize('to_columns', [
+    lambda data: rows_to_columns(data),
+    lambda data: {col: np.array(vals) for col, vals in rows_to_columns(data).items()},
+    lambda data: pa.Table.from_pydict(dict(rows_to_columns(data))),
+])
+def test_write_columns_columnar(with_test_table, to_columns):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        first_commit = dssc.write_columns(TEST_TABLE, to_columns(TEST_DATA_INITIAL), write_mode=WRITE_MODE_EXECUTEMANY)
+        second_commit = dssc.write_columns(TEST_TABLE, to_columns(TEST_DATA_UPDATE), write_mode=WRITE_MODE_EXECUTEMANY)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, first_commit), 'name')
+        compare_rows(TEST_DATA_FINAL, dssc.read_rows(TEST_TABLE, second_commit), 'name')
+
+
+def test_write_pandas_executemany(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        df = pd.DataFrame(TEST_DATA_INITIAL)
+        first_commit = dssc.write_pandas(TEST_TABLE, df, commit=True, batch_size=2, write_mode=WRITE_MODE_EXECUTEMANY)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, first_commit), 'name')
+
+
+def test_write_columns_parallel(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        commit = dssc.write_columns(TEST_TABLE, rows_to_columns(TEST_DATA_INITIAL), batch_size=1, parallelism=2)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, commit), 'name')
+
+
+def test_write_rows_mismatched_keys(with_test_table):
+    dolt = with_test_table
+    rows = [TEST_DATA_INITIAL[0], {'id': 5, 'name': 'Kitty'}]
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        with pytest.raises(ValueError):
+            dssc.write_rows(TEST_TABLE, rows)
+
+
+def test_write_pandas_insert_is_columnar(with_test_table):
+    dolt = with_test_table
+    with DoltSQLServerContext(dolt, TEST_SERVER_CONFIG) as dssc:
+        with mock.patch.object(dssc, 'write_rows', side_effect=AssertionError('write_pandas must not write rows')):
+            commit = dssc.write_pandas(TEST_TABLE, pd.DataFrame(TEST_DATA_INITIAL), commit=True, batch_size=2)
+        compare_rows(TEST_DATA_INITIAL, dssc.read_rows(TEST_TABLE, commit), 'name')
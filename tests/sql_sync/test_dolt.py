@@ -13,6 +13,7 @@ from .helpers.data_helper import (assert_rows_equal,
 from doltpy.sql.sync.dolt import get_table_reader_diffs, get_table_reader, get_target_writer
 from doltpy.sql.sync.db_tools import get_table_metadata, DoltTableUpdate
 import logging
+import pytest
 from typing import Callable, Tuple, List
 from sqlalchemy import Table
 from doltpy.sql import DoltSQLServerContext
@@ -86,6 +87,12 @@ def test_get_target_writer(db_with_table):
         assert_rows_equal(update, result)
 
 
+def test_get_target_writer_missing_table(db_with_table):
+    dssc, _ = db_with_table
+    with pytest.raises(ValueError, match="does not exist"):
+        get_target_writer(dssc, commit=True)({"missing_table": TEST_DATA_INITIAL})
+
+
 def _dolt_table_read_helper(dssc: DoltSQLServerContext, table_name: str):
     table = get_table_metadata(dssc.engine, table_name)
     with dssc.engine.connect() as conn: